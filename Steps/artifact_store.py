@@ -0,0 +1,175 @@
+"""
+Intermediate artifact store for the Airflow DAGs.
+
+XCom values are stored in the Airflow metadata database, so passing whole
+API payloads between tasks bloats that database and slows the scheduler.
+Tasks instead write large payloads here and exchange only a short reference
+through XCom:
+
+    ref = put_artifact(leaderboard_data)    # "sha256:<hex>"
+    leaderboard_data = get_artifact(ref)
+
+Artifacts are gzip-compressed JSON, addressed by the SHA-256 digest of their
+content, so writing the same payload twice (e.g. on a task retry) stores it
+only once.
+
+Configuration (environment variables):
+- ARTIFACT_STORE_URL: where artifacts are kept (default "artifacts"). A local
+  directory, or an object-store URL such as "s3://bucket/tft-artifacts",
+  which requires the optional fsspec package and its backend (e.g. s3fs)
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+REFERENCE_PREFIX = "sha256:"
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of gzip-compressed JSON payloads.
+    """
+
+    def __init__(self, url=None):
+        self.url = (url or os.environ.get("ARTIFACT_STORE_URL", "artifacts")).rstrip("/")
+
+        if "://" in self.url:
+            try:
+                import fsspec
+            except ImportError as e:
+                raise ImportError(f"fsspec is required for artifact store {self.url}") from e
+            self.fs, self.root = fsspec.core.url_to_fs(self.url)
+        else:
+            self.fs, self.root = None, self.url
+
+    def _path(self, digest):
+        """Location of an artifact, sharded by the first byte of its digest"""
+        return f"{self.root}/{digest[:2]}/{digest}.json.gz"
+
+    def _exists(self, path):
+        return self.fs.exists(path) if self.fs else os.path.exists(path)
+
+    def _write(self, path, blob):
+        if self.fs:
+            # Object stores make a single put atomic
+            self.fs.pipe_file(path, blob)
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    def _read(self, path):
+        if self.fs:
+            return self.fs.cat_file(path)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def put(self, data):
+        """
+        Store a JSON-serializable payload.
+
+        Args:
+            data: Payload to store
+
+        Returns:
+            str: Reference to pass through XCom
+        """
+        payload = json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self._path(digest)
+
+        if not self._exists(path):
+            # mtime=0 keeps the compressed bytes identical for identical payloads
+            self._write(path, gzip.compress(payload, mtime=0))
+
+        print(f"Stored artifact {digest[:12]} ({len(payload)} bytes)")
+        return f"{REFERENCE_PREFIX}{digest}"
+
+    def get(self, ref):
+        """
+        Load a payload stored with put().
+
+        Args:
+            ref (str): Reference returned by put()
+
+        Returns:
+            The stored payload
+
+        Raises:
+            ValueError: If ref is not an artifact reference
+            FileNotFoundError: If the artifact does not exist
+        """
+        if not is_artifact_ref(ref):
+            raise ValueError(f"Not an artifact reference: {ref!r}")
+
+        digest = ref[len(REFERENCE_PREFIX):]
+        return json.loads(gzip.decompress(self._read(self._path(digest))))
+
+
+def is_artifact_ref(value):
+    """Whether a value is a reference returned by ArtifactStore.put()"""
+    return isinstance(value, str) and value.startswith(REFERENCE_PREFIX)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store():
+    """
+    Get the process-wide artifact store, creating it on first use.
+
+    Returns:
+        ArtifactStore: The shared store
+    """
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore()
+
+    return _store
+
+
+def put_artifact(data):
+    """
+    Store a payload in the shared artifact store.
+
+    Args:
+        data: JSON-serializable payload
+
+    Returns:
+        str: Reference to pass through XCom
+    """
+    return get_artifact_store().put(data)
+
+
+def get_artifact(ref, default=None):
+    """
+    Load a payload from the shared artifact store.
+
+    Args:
+        ref (str): Reference pulled from XCom, or None if the upstream task
+            returned nothing
+        default: Value returned when ref is None
+
+    Returns:
+        The stored payload, or default
+    """
+    if ref is None:
+        return default
+    return get_artifact_store().get(ref)
@@ -0,0 +1,118 @@
+"""
+Bulk write helpers for the ETL loaders.
+
+Rows are sent as chunked multi-row INSERT statements, so loading N rows
+costs roughly N / chunk_size round trips instead of N.
+
+Configuration (environment variables):
+- DB_BULK_CHUNK_SIZE: rows per INSERT statement (default 500)
+"""
+
+import os
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def get_chunk_size(chunk_size=None):
+    """
+    Resolve the chunk size to use for a bulk write.
+
+    Args:
+        chunk_size (int): Explicit chunk size, or None to use DB_BULK_CHUNK_SIZE
+
+    Returns:
+        int: Number of rows per INSERT statement
+    """
+    if chunk_size is None:
+        chunk_size = int(os.environ.get("DB_BULK_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+    return max(1, int(chunk_size))
+
+
+def chunked(rows, size):
+    """
+    Split an iterable of rows into lists of at most `size` rows.
+
+    Args:
+        rows (iterable): Rows to split
+        size (int): Maximum rows per chunk
+
+    Yields:
+        list: Next chunk of rows
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def build_insert_statement(table, columns, num_rows, update_columns=None, ignore=False, on_duplicate=None):
+    """
+    Build a multi-row INSERT statement with %s placeholders.
+
+    Args:
+        table (str): Target table name
+        columns (list): Column names in row order
+        num_rows (int): Number of VALUES tuples in the statement
+        update_columns (list): Columns to overwrite on duplicate key, if any
+        ignore (bool): Use INSERT IGNORE instead of INSERT
+        on_duplicate (str): Custom ON DUPLICATE KEY UPDATE assignments,
+            used instead of update_columns when given
+
+    Returns:
+        str: SQL statement
+    """
+    column_list = ", ".join(f"`{column}`" for column in columns)
+    row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    values = ", ".join([row_placeholder] * num_rows)
+
+    statement = f"INSERT {'IGNORE ' if ignore else ''}INTO {table} ({column_list}) VALUES {values}"
+
+    if on_duplicate:
+        statement += f" ON DUPLICATE KEY UPDATE {on_duplicate}"
+    elif update_columns:
+        updates = ", ".join(f"`{column}` = VALUES(`{column}`)" for column in update_columns)
+        statement += f" ON DUPLICATE KEY UPDATE {updates}"
+
+    return statement
+
+
+def bulk_insert(cursor, table, columns, rows, update_columns=None, ignore=False, chunk_size=None, on_duplicate=None):
+    """
+    Insert rows using chunked multi-row INSERT statements.
+
+    Args:
+        cursor: Open database cursor (the caller owns the transaction)
+        table (str): Target table name
+        columns (list): Column names in row order
+        rows (iterable): Tuples of values, one per row, in `columns` order
+        update_columns (list): Columns to overwrite on duplicate key, if any
+        ignore (bool): Use INSERT IGNORE instead of INSERT
+        chunk_size (int): Rows per statement (defaults to DB_BULK_CHUNK_SIZE)
+        on_duplicate (str): Custom ON DUPLICATE KEY UPDATE assignments
+
+    Returns:
+        int: Number of rows sent to the database
+    """
+    chunk_size = get_chunk_size(chunk_size)
+    total = 0
+
+    # Statements for full chunks are identical, so build them once
+    full_statement = None
+
+    for chunk in chunked(rows, chunk_size):
+        if len(chunk) == chunk_size:
+            if full_statement is None:
+                full_statement = build_insert_statement(table, columns, chunk_size, update_columns, ignore, on_duplicate)
+            statement = full_statement
+        else:
+            statement = build_insert_statement(table, columns, len(chunk), update_columns, ignore, on_duplicate)
+
+        params = [value for row in chunk for value in row]
+        cursor.execute(statement, params)
+        total += len(chunk)
+
+    return total
@@ -6,7 +6,12 @@ This will add the ability to extract Little Legend (Pet) data from match details
 
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from dotenv import load_dotenv
+from Steps.riot_client import get_riot_client
+from Steps.match_cache import fetch_match_details, companions_from_match
+from Steps.load import load_match_companions_to_sql
+from Steps.sync_state import get_sync_states, update_sync_states
 
 # Load environment variables
 load_dotenv(r"VinUni_database_project_tft_analyzer\.env")
@@ -28,32 +33,49 @@ def extract_match_companions(match_id, region="vn2"):
             print("Missing RIOT_API_KEY in environment variables")
             return []
             
-        url = f"https://{region}.api.riotgames.com/tft/match/v1/matches/{match_id}?api_key={api_key}"
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        match_data = response.json()
-        companions = []
+        # Each match is downloaded once and shared through the match cache
+        match_data = fetch_match_details(match_id, region)
         
         # Extract companion data for each participant
-        for participant in match_data.get('info', {}).get('participants', []):
-            companion_data = participant.get('companion', {})
-            if companion_data:
-                companions.append({
-                    'match_id': match_id,
-                    'puuid': participant.get('puuid'),
-                    'content_id': companion_data.get('content_ID'),
-                    'skin_id': companion_data.get('skin_ID'),
-                    'placement': participant.get('placement')
-                })
-        
-        return companions
+        return companions_from_match(match_data, match_id)
         
     except Exception as e:
         print(f"Error extracting match companion data: {e}")
         return []
 
-def extract_player_match_history(puuid, region="vn2", count=20):
+def fetch_match_id_page(puuid, region="vn2", count=20, start=0, start_time=None):
+    """
+    Fetch one page of a player's match IDs, newest first.
+    
+    Args:
+        puuid (str): Player's PUUID
+        region (str): Region code (e.g., "vn2", "kr", "jp1")
+        count (int): Number of matches to retrieve
+        start (int): Index of the first match to return
+        start_time (int): Only return matches played at or after this epoch time (seconds)
+        
+    Returns:
+        list: List of match IDs
+        
+    Raises:
+        requests.exceptions.RequestException: If the request fails
+    """
+    # Determine the correct regional routing value
+    regional_routing = "asia"  # Default to asia for Vietnam server (vn2)
+    
+    params = {"count": count}
+    if start:
+        params["start"] = start
+    if start_time is not None:
+        params["startTime"] = int(start_time)
+    
+    url = f"https://{regional_routing}.api.riotgames.com/tft/match/v1/matches/by-puuid/{puuid}/ids"
+    response = get_riot_client().get(url, method="matches-by-puuid", params=params)
+    response.raise_for_status()
+    
+    return response.json()
+
+def extract_player_match_history(puuid, region="vn2", count=20, start_time=None):
     """
     Extract a player's recent match history.
     
@@ -61,6 +83,7 @@ def extract_player_match_history(puuid, region="vn2", count=20):
         puuid (str): Player's PUUID
         region (str): Region code (e.g., "vn2", "kr", "jp1")
         count (int): Number of matches to retrieve
+        start_time (int): Only return matches played at or after this epoch time (seconds)
         
     Returns:
         list: List of match IDs
@@ -71,19 +94,76 @@ def extract_player_match_history(puuid, region="vn2", count=20):
             print("Missing RIOT_API_KEY in environment variables")
             return []
             
-        # Determine the correct regional routing value
-        regional_routing = "asia"  # Default to asia for Vietnam server (vn2)
-        
-        url = f"https://{regional_routing}.api.riotgames.com/tft/match/v1/matches/by-puuid/{puuid}/ids?count={count}&api_key={api_key}"
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        return response.json()
+        return fetch_match_id_page(puuid, region, count, start_time=start_time)
         
     except Exception as e:
         print(f"Error extracting player match history: {e}")
         return []
 
+def extract_new_match_ids(puuid, sync_state=None, region="vn2", count=50):
+    """
+    Extract only the matches a player has played since the last sync.
+    
+    Every match since the last sync is listed, one page of `count` at a time,
+    so a high-water mark never skips games. A first sync only takes the most
+    recent `count` matches.
+    
+    Args:
+        puuid (str): Player's PUUID
+        sync_state (dict): The player's high-water mark from get_sync_states, or None
+            to fetch the most recent `count` matches
+        region (str): Region code (e.g., "vn2", "kr", "jp1")
+        count (int): Matches per page
+        
+    Returns:
+        list: Match IDs newer than the high-water mark, newest first, or None if
+        the listing failed part-way (the mark must then not be advanced)
+    """
+    if not sync_state:
+        return extract_player_match_history(puuid, region, count)
+    
+    # startTime is in seconds and inclusive, so the last synced match can come back
+    start_time = sync_state['last_match_timestamp'] // 1000
+    
+    match_ids = []
+    try:
+        while True:
+            page = fetch_match_id_page(puuid, region, count, start=len(match_ids), start_time=start_time)
+            match_ids.extend(page)
+            if len(page) < count:
+                break
+    except requests.exceptions.RequestException as e:
+        print(f"Error extracting new matches for player {puuid}: {e}")
+        return None
+    
+    return [match_id for match_id in match_ids if match_id != sync_state['last_match_id']]
+
+def contiguous_sync_state(match_ids, completed):
+    """
+    Find how far a player's high-water mark can safely move.
+    
+    The mark moves to the newest match below which every one of the player's
+    new matches was downloaded and loaded. A failed match stops it there, so
+    the next run lists that match again.
+    
+    Args:
+        match_ids (list): The player's new match IDs, newest first
+        completed (dict): match_id -> game_datetime (ms) of loaded matches
+        
+    Returns:
+        dict: {'last_match_id', 'last_match_timestamp'}, or None if the mark can't move
+    """
+    state = None
+    
+    for match_id in reversed(match_ids):
+        if match_id not in completed:
+            break
+        match_timestamp = completed[match_id]
+        if match_timestamp is not None:
+            state = {'last_match_id': match_id, 'last_match_timestamp': match_timestamp}
+    
+    return state
+
 def extract_player_companions(puuid, region="vn2", match_count=50):
     """
     Extract all companion data for a player's recent matches.
@@ -103,19 +183,141 @@ def extract_player_companions(puuid, region="vn2", match_count=50):
         print(f"No matches found for player {puuid}")
         return {}
     
-    # Extract companion data for each match
+    # Extract companion data for each match as the downloads complete
     companion_data = {}
-    for match_id in match_ids:
-        companions = extract_match_companions(match_id, region)
-        if companions:
-            # Find this player's companion in this match
-            for companion in companions:
-                if companion['puuid'] == puuid:
-                    companion_data[match_id] = companion
-                    break
+    for match_id, match_data in stream_match_details(match_ids, region):
+        # Find this player's companion in this match
+        for companion in companions_from_match(match_data, match_id):
+            if companion['puuid'] == puuid:
+                companion_data[match_id] = companion
+                break
     
     return companion_data
 
+def stream_match_details(match_ids, region="vn2", max_workers=None):
+    """
+    Download match details with bounded concurrency, yielding each as it arrives.
+    
+    At most max_workers downloads are in flight at any time, and results are
+    yielded in completion order rather than request order. Matches that fail
+    to download are reported and skipped.
+    
+    Args:
+        match_ids (iterable): Match IDs to download
+        region (str): Region code (e.g., "vn2", "kr", "jp1")
+        max_workers (int): Concurrent downloads (defaults to MATCH_DOWNLOAD_WORKERS or 8)
+        
+    Yields:
+        tuple: (match_id, match_data)
+    """
+    if max_workers is None:
+        max_workers = int(os.environ.get("MATCH_DOWNLOAD_WORKERS", 8))
+    
+    match_ids = iter(match_ids)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        
+        def submit_next():
+            match_id = next(match_ids, None)
+            if match_id is None:
+                return False
+            pending[executor.submit(fetch_match_details, match_id, region)] = match_id
+            return True
+        
+        # Fill the pipeline, then submit one new download per finished one
+        for _ in range(max_workers):
+            if not submit_next():
+                break
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                match_id = pending.pop(future)
+                submit_next()
+                try:
+                    match_data = future.result()
+                except requests.exceptions.RequestException as e:
+                    print(f"Error downloading match {match_id}: {e}")
+                    continue
+                yield match_id, match_data
+
+def extract_and_load_companions(puuids, region="vn2", match_count=50, batch_size=None, max_workers=None,
+                                incremental=True):
+    """
+    Extract companion data for many players and load it as matches stream in.
+    
+    Match IDs are collected for every player and deduplicated, so each shared
+    match is downloaded once. All eight participants' companions are taken from
+    every match and written to tft_match_companion in batches while the
+    remaining downloads are still running.
+    
+    In incremental mode only matches newer than each player's high-water mark
+    are fetched. A mark then moves up to the newest match below which all of
+    the player's new matches were downloaded and committed, so matches that
+    fail to download or load are fetched again by the next run.
+    
+    Args:
+        puuids (list): PUUIDs of the players to extract
+        region (str): Region code (e.g., "vn2", "kr", "jp1")
+        match_count (int): Number of recent matches per player
+        batch_size (int): Companion rows per load (defaults to COMPANION_LOAD_BATCH_SIZE or 500)
+        max_workers (int): Concurrent match downloads
+        incremental (bool): Only sync matches newer than the stored high-water marks
+        
+    Returns:
+        int: Number of companion rows loaded
+    """
+    if batch_size is None:
+        batch_size = int(os.environ.get("COMPANION_LOAD_BATCH_SIZE", 500))
+    
+    sync_states = get_sync_states(puuids) if incremental else {}
+    
+    # Collect unique match IDs across all players, keeping request order
+    player_match_ids = {}
+    match_ids = {}
+    for puuid in puuids:
+        player_match_ids[puuid] = extract_new_match_ids(puuid, sync_states.get(puuid), region, match_count)
+        for match_id in player_match_ids[puuid] or []:
+            match_ids.setdefault(match_id, None)
+    
+    print(f"Streaming {len(match_ids)} unique matches for {len(puuids)} players...")
+    
+    # match_id -> game_datetime of every match whose companions are committed
+    completed = {}
+    batch = []
+    batch_matches = {}
+    total_loaded = 0
+    
+    def flush():
+        nonlocal total_loaded
+        if load_match_companions_to_sql(batch):
+            completed.update(batch_matches)
+            total_loaded += len(batch)
+        batch.clear()
+        batch_matches.clear()
+    
+    for match_id, match_data in stream_match_details(match_ids, region, max_workers):
+        batch.extend(companions_from_match(match_data, match_id))
+        batch_matches[match_id] = match_data.get('info', {}).get('game_datetime')
+        if len(batch) >= batch_size:
+            flush()
+    
+    if batch_matches:
+        flush()
+    
+    # Players whose listing failed keep their mark; the others only move past
+    # matches that were all downloaded and committed
+    if incremental:
+        new_sync_states = {}
+        for puuid, player_ids in player_match_ids.items():
+            state = contiguous_sync_state(player_ids, completed) if player_ids else None
+            if state is not None:
+                new_sync_states[puuid] = state
+        update_sync_states(new_sync_states)
+    
+    return total_loaded
+
 def enrich_match_data_with_companions(match_data):
     """
     Enrich existing match data with companion information.
@@ -0,0 +1,138 @@
+"""
+Shared MySQL connection pool for the ETL steps.
+
+Every loader in Steps draws its connection from here instead of calling
+mysql.connector.connect() itself, so a run that loads several tables (or
+several players) reuses a handful of warm connections.
+
+Configuration (environment variables):
+- DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME: connection settings
+- DB_POOL_NAME: name of the pool (default "tft_etl_pool")
+- DB_POOL_SIZE: number of pooled connections (default 5, max 32)
+- DB_POOL_TIMEOUT: seconds to wait for a free connection (default 30)
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Hard limit imposed by mysql-connector-python on a single pool
+MAX_POOL_SIZE = pooling.CNX_POOL_MAXSIZE
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_db_config():
+    """
+    Build the mysql.connector connection settings from environment variables.
+
+    Returns:
+        dict: Keyword arguments for mysql.connector
+    """
+    return {
+        "host": os.environ.get("DB_HOST"),
+        "port": int(os.environ.get("DB_PORT", 3306)),
+        "user": os.environ.get("DB_USER"),
+        "password": os.environ.get("DB_PASSWORD"),
+        "database": os.environ.get("DB_NAME"),
+    }
+
+
+def get_pool():
+    """
+    Get the process-wide connection pool, creating it on first use.
+
+    Returns:
+        MySQLConnectionPool: The shared pool
+    """
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool_size = int(os.environ.get("DB_POOL_SIZE", 5))
+                pool_size = max(1, min(pool_size, MAX_POOL_SIZE))
+
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=os.environ.get("DB_POOL_NAME", "tft_etl_pool"),
+                    pool_size=pool_size,
+                    pool_reset_session=True,
+                    **get_db_config()
+                )
+                print(f"Created MySQL connection pool '{_pool.pool_name}' with {pool_size} connections")
+
+    return _pool
+
+
+def _check_connection(conn):
+    """
+    Health check a pooled connection before handing it out.
+
+    Reconnects connections that were dropped by the server (e.g. after
+    wait_timeout) so callers never receive a dead connection.
+    """
+    try:
+        conn.ping(reconnect=True, attempts=3, delay=1)
+    except mysql.connector.Error as e:
+        conn.close()
+        raise mysql.connector.errors.InterfaceError(f"Pooled connection failed health check: {e}")
+
+
+def get_connection(timeout=None):
+    """
+    Borrow a healthy connection from the shared pool.
+
+    The caller must call conn.close() when done, which returns the connection
+    to the pool instead of closing the socket.
+
+    Args:
+        timeout (float): Seconds to wait for a free connection when the pool
+            is exhausted (defaults to DB_POOL_TIMEOUT)
+
+    Returns:
+        PooledMySQLConnection: A connection that passed the health check
+    """
+    if timeout is None:
+        timeout = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+
+    pool = get_pool()
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise PoolError(f"No free connection in pool '{pool.pool_name}' after {timeout}s")
+            time.sleep(0.1)
+
+    _check_connection(conn)
+    return conn
+
+
+@contextmanager
+def pooled_connection(timeout=None):
+    """
+    Context manager wrapper around get_connection().
+
+    Usage:
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            ...
+    """
+    conn = get_connection(timeout)
+    try:
+        yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,121 @@
+"""
+Optional sink for debug dumps of intermediate ETL data.
+
+The extract and process steps can dump their payloads for debugging. Dumps
+are disabled by default; when enabled they are written in the background as
+compact gzip-compressed JSON, one directory per run, so concurrent players
+and runs never overwrite each other:
+
+    <DEBUG_DUMP_DIR>/<run id>/<name>[-<key>].json.gz
+
+Configuration (environment variables):
+- DEBUG_DUMPS: "off" (default), "async" (background writes) or "sync"
+- DEBUG_DUMP_DIR: root directory for dumps (default "debug_dumps")
+- DEBUG_RUN_ID: run namespace; defaults to the Airflow run ID when running
+  in a task, otherwise to the process start time and PID
+"""
+
+import os
+import re
+import gzip
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+class DebugSink:
+    """
+    Writes debug dumps synchronously or on a background thread.
+    """
+
+    def __init__(self, mode=None, root=None, run_id=None):
+        self.mode = (mode or os.environ.get("DEBUG_DUMPS", "off")).lower()
+        self.root = root or os.environ.get("DEBUG_DUMP_DIR", "debug_dumps")
+        self.run_id = run_id or os.environ.get("DEBUG_RUN_ID") or os.environ.get("AIRFLOW_CTX_DAG_RUN_ID") \
+            or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+        # One writer keeps background dumps from competing with the ETL for I/O
+        self.executor = ThreadPoolExecutor(max_workers=1) if self.mode == "async" else None
+
+    @property
+    def enabled(self):
+        return self.mode in ("async", "sync")
+
+    def _path(self, name, key=None):
+        filename = f"{name}-{key}" if key else name
+        # Keys are usually Riot IDs, which may contain spaces and other symbols
+        filename = re.sub(r"[^\w.-]+", "_", filename)
+        return os.path.join(self.root, re.sub(r"[^\w.-]+", "_", self.run_id), f"{filename}.json.gz")
+
+    def _write(self, path, data):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error writing debug dump {path}: {e}")
+
+    def dump(self, name, data, key=None):
+        """
+        Dump data for debugging, if dumps are enabled.
+
+        In async mode the data is serialized later on the writer thread, so
+        callers must not modify it after dumping.
+
+        Args:
+            name (str): Dump name, e.g. "processed_data"
+            data: JSON-serializable data
+            key (str): Optional suffix that keeps per-player dumps apart
+        """
+        if not self.enabled:
+            return
+
+        path = self._path(name, key)
+        if self.executor:
+            self.executor.submit(self._write, path, data)
+        else:
+            self._write(path, data)
+
+    def flush(self):
+        """Wait for pending background writes"""
+        if self.executor:
+            self.executor.submit(lambda: None).result()
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_debug_sink():
+    """
+    Get the process-wide debug sink, creating it on first use.
+
+    Returns:
+        DebugSink: The shared sink
+    """
+    global _sink
+
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = DebugSink()
+
+    return _sink
+
+
+def dump_debug(name, data, key=None):
+    """
+    Dump data to the shared debug sink (a no-op unless DEBUG_DUMPS is set).
+
+    Args:
+        name (str): Dump name
+        data: JSON-serializable data
+        key (str): Optional suffix that keeps per-player dumps apart
+    """
+    get_debug_sink().dump(name, data, key)
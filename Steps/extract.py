@@ -1,18 +1,23 @@
-import json
 import requests
 import os
+import ijson
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from Steps.riot_client import get_riot_client
+from Steps.player_cache import get_player_cache
+from Steps.debug_sink import dump_debug
 
 # Load environment variables from .env file
 load_dotenv(r"VinUni_database_project_tft_analyzer\.env")
 
-def extract_data_from_api(tag_line, game_name):
+def extract_data_from_api(tag_line, game_name, session=None):
     """
     Extracts data from the given API URL, tag_line, game_name, and returns ....
     
     Args:
         tag_line (str): tag line of the player.
         game_name (str): The name of the player.
+        session (requests.Session): Optional keep-alive session to reuse across players.
         
     Returns:
         data (dict): The extracted data from the API in JSON format.
@@ -42,19 +47,208 @@ def extract_data_from_api(tag_line, game_name):
     try:
         # Fixed the URL by adding a question mark before 'source'
         url = f"https://api.metatft.com/public/profile/lookup_by_riotid/VN2/{game_name}/{tag_line}?source=full_profile&tft_set=TFTSet14&include_revival_matches=true"
-        response = requests.get(url)
+        response = (session or requests).get(url)
         print(url)
         data = response.json()
-        with open("data.json", "w") as f:
-            json.dump(data, f, indent=4)  # save json to debug
+        dump_debug("data", data, key=f"{game_name}#{tag_line}")  # save json to debug
+        
+        # Keep the player cache in sync if this player was renamed
+        sync_player_cache(data.get('summoner', {}), game_name, tag_line)
+        
         return data, game_name, tag_line
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data from API: {e}")
         return None
 
+# Match fields used by process(); everything else in a match is skipped unparsed
+MATCH_FIELDS = {
+    'matches.item.placement': ('placement',),
+    'matches.item.match_timestamp': ('match_timestamp',),
+    'matches.item.summary.player_rating': ('summary', 'player_rating'),
+}
+
+# Profile fields used by process()
+PROFILE_FIELDS = {
+    'summoner.puuid': ('summoner', 'puuid'),
+    'ranked.rating_text': ('ranked', 'rating_text'),
+    'ranked.num_games': ('ranked', 'num_games'),
+}
+
+# Riot ID fields kept when the profile includes them, for the player cache
+RIOT_ID_FIELDS = {
+    'summoner.riot_id': ('summoner', 'riot_id'),
+    'summoner.game_name': ('summoner', 'game_name'),
+    'summoner.tag_line': ('summoner', 'tag_line'),
+    'summoner.gameName': ('summoner', 'gameName'),
+    'summoner.tagLine': ('summoner', 'tagLine'),
+}
+
+def riot_id_from_profile(summoner):
+    """
+    Get the Riot ID a metatft profile reports for its player.
+    
+    Args:
+        summoner (dict): The profile's 'summoner' field
+        
+    Returns:
+        tuple: (game_name, tag_line) as Riot spells them, or None if the
+        profile doesn't include them
+    """
+    riot_id = summoner.get('riot_id')
+    if riot_id and '#' in riot_id:
+        game_name, tag_line = riot_id.rsplit('#', 1)
+        return game_name, tag_line
+    
+    game_name = summoner.get('game_name') or summoner.get('gameName')
+    tag_line = summoner.get('tag_line') or summoner.get('tagLine')
+    if game_name and tag_line:
+        return game_name, tag_line
+    return None
+
+def sync_player_cache(summoner, game_name, tag_line):
+    """
+    Update the player cache after a successful profile lookup.
+    
+    The Riot ID in the response is recorded as it is. Without one, the typed
+    Riot ID is only compared with the cached one (case-insensitively), since
+    its casing may not be the player's.
+    
+    Args:
+        summoner (dict): The profile's 'summoner' field
+        game_name (str): Game name the lookup was made with
+        tag_line (str): Tag line the lookup was made with
+    """
+    puuid = summoner.get('puuid')
+    if not puuid:
+        return
+    
+    riot_id = riot_id_from_profile(summoner)
+    if riot_id:
+        get_player_cache().record_riot_id(puuid, *riot_id)
+    else:
+        get_player_cache().check_riot_id(puuid, game_name, tag_line)
+
+def _has_profile_fields(profile):
+    """Whether every field in PROFILE_FIELDS has been parsed"""
+    return all(path[-1] in profile.get(path[0], {}) for path in PROFILE_FIELDS.values())
+
+def _set_field(target, path, value):
+    """Set a nested field, e.g. ('summary', 'player_rating'), creating parents as needed"""
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+    target[path[-1]] = value
+
+def iter_profile_matches(stream, profile, num_matches=None):
+    """
+    Incrementally parse a metatft profile, yielding its matches one at a time.
+    
+    Only the fields process() needs are built: each match is reduced to its
+    placement, timestamp and rating while it is parsed, so memory stays flat
+    however many matches the profile holds. The summoner and ranked fields
+    are written into `profile` as they are seen, wherever they appear in the
+    document, and are complete once the generator is exhausted.
+    
+    Args:
+        stream: Binary file-like object with the JSON document
+        profile (dict): Receives the 'summoner' and 'ranked' fields
+        num_matches (int): Stop yielding after this many matches (None for all)
+        
+    Yields:
+        dict: Reduced match with 'placement', 'match_timestamp' and 'summary'
+    """
+    profile.setdefault('summoner', {})
+    profile.setdefault('ranked', {})
+    
+    match = None
+    yielded = 0
+    
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if prefix in PROFILE_FIELDS:
+            _set_field(profile, PROFILE_FIELDS[prefix], value)
+            
+        elif prefix in RIOT_ID_FIELDS and event == 'string':
+            _set_field(profile, RIOT_ID_FIELDS[prefix], value)
+            
+        elif prefix == 'matches.item':
+            if event == 'start_map' and (num_matches is None or yielded < num_matches):
+                match = {}
+            elif event == 'end_map' and match is not None:
+                yield match
+                match = None
+                yielded += 1
+                
+        elif match is not None and prefix in MATCH_FIELDS:
+            _set_field(match, MATCH_FIELDS[prefix], value)
+            
+        # Stop reading once every needed field has been seen
+        if num_matches is not None and yielded >= num_matches and _has_profile_fields(profile):
+            return
+
+def stream_data_from_api(tag_line, game_name, session=None, num_matches=50):
+    """
+    Streaming variant of extract_data_from_api for large profiles.
+    
+    The response is parsed while it downloads instead of being loaded whole:
+    the returned data has the same shape process() expects, but its
+    'matches' entry is a generator of reduced matches, and 'summoner' and
+    'ranked' are filled in as the generator is consumed.
+    
+    Args:
+        tag_line (str): tag line of the player.
+        game_name (str): The name of the player.
+        session (requests.Session): Optional keep-alive session to reuse across players.
+        num_matches (int): Number of recent matches to read.
+        
+    Returns:
+        tuple: (data, game_name, tag_line), or None if the request failed
+    """
+    try:
+        url = f"https://api.metatft.com/public/profile/lookup_by_riotid/VN2/{game_name}/{tag_line}?source=full_profile&tft_set=TFTSet14&include_revival_matches=true"
+        response = (session or requests).get(url, stream=True)
+        response.raise_for_status()
+        print(url)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching data from API: {e}")
+        return None
+    
+    data = {}
+    
+    def matches():
+        try:
+            response.raw.decode_content = True
+            yield from iter_profile_matches(response.raw, data, num_matches)
+        finally:
+            response.close()
+        
+        # Keep the player cache in sync if this player was renamed
+        sync_player_cache(data['summoner'], game_name, tag_line)
+    
+    data['matches'] = matches()
+    return data, game_name, tag_line
+
+def fetch_leaderboard_tier(client, tier, endpoint):
+    """
+    Fetches a single leaderboard tier using the shared Riot API client.
+    
+    Args:
+        client (RiotClient): Rate-limited client with one keep-alive session
+        tier (str): Tier name (challenger, grandmaster, master)
+        endpoint (str): Riot API endpoint for the tier
+        
+    Returns:
+        dict: Raw league list response for the tier
+    """
+    print(f"Fetching {tier} leaderboard...")
+    response = client.get(endpoint, method="league-tier")
+    response.raise_for_status()
+    return response.json()
+
 def extract_leaderboard_data():
     """
     Extracts leaderboard data from Riot API for Challenger, Grandmaster, and Master tiers.
+
+    The three tier requests are issued concurrently over one keep-alive session,
+    so extraction takes about as long as the slowest single endpoint.
     
     Returns:
         dict: Combined leaderboard data containing all tiers with player information
@@ -65,10 +259,6 @@ def extract_leaderboard_data():
         print("Error: RIOT_API_KEY not found in environment variables")
         return None
     
-    headers = {
-        "X-Riot-Token": api_key
-    }
-    
     # TFT API endpoints for different tiers
     endpoints = {
         "challenger": "https://vn2.api.riotgames.com/tft/league/v1/challenger",
@@ -84,12 +274,18 @@ def extract_leaderboard_data():
     }
     
     try:
-        for tier, endpoint in endpoints.items():
-            print(f"Fetching {tier} leaderboard...")
-            response = requests.get(endpoint, headers=headers)
-            response.raise_for_status()
-            
-            tier_data = response.json()
+        client = get_riot_client()
+        
+        # Fetch all tiers concurrently over the client's keep-alive session
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            futures = {
+                tier: executor.submit(fetch_leaderboard_tier, client, tier, endpoint)
+                for tier, endpoint in endpoints.items()
+            }
+            tier_responses = {tier: future.result() for tier, future in futures.items()}
+        
+        # Combine results in tier order: challenger -> grandmaster -> master
+        for tier, tier_data in tier_responses.items():
             leaderboard_data[tier] = tier_data.get("entries", [])
             
             # Use the first successful response timestamp as last_updated
@@ -97,8 +293,7 @@ def extract_leaderboard_data():
                 leaderboard_data["last_updated"] = tier_data.get("timestamp")
         
         # Save leaderboard data for debugging
-        with open("leaderboard_data.json", "w") as f:
-            json.dump(leaderboard_data, f, indent=4)
+        dump_debug("leaderboard_data", leaderboard_data)
         
         print(f"Successfully extracted leaderboard data:")
         print(f"- Challenger: {len(leaderboard_data['challenger'])} players")
@@ -111,54 +306,134 @@ def extract_leaderboard_data():
         print(f"Error fetching leaderboard data from Riot API: {e}")
         return None
 
-def extract_player_details_from_summoner_id(summoner_id):
+def extract_player_details_from_summoner_id(summoner_id, use_cache=True):
     """
     Gets detailed player information including riot ID from summoner ID.
+
+    The persistent player cache is consulted first; the summoner lookup is
+    skipped when the PUUID is already known, and the account lookup is
+    skipped while the cached Riot ID is still fresh.
     
     Args:
         summoner_id (str): The summoner ID
+        use_cache (bool): Whether to read from and write to the player cache
         
     Returns:
         dict: Player details including riot ID (game_name#tag_line)
     """
+    cache = get_player_cache() if use_cache else None
+    
+    if cache:
+        cached_details = cache.get(summoner_id)
+        if cached_details:
+            return cached_details
+    
     api_key = os.environ.get("RIOT_API_KEY")
     
     if not api_key:
         return None
         
-    headers = {
-        "X-Riot-Token": api_key
-    }
+    client = get_riot_client()
     
     try:
-        # Get summoner details first
-        summoner_url = f"https://vn2.api.riotgames.com/tft/summoner/v1/summoners/{summoner_id}"
-        summoner_response = requests.get(summoner_url, headers=headers)
-        summoner_response.raise_for_status()
-        summoner_data = summoner_response.json()
+        # Get summoner details first, unless the PUUID is already cached
+        summoner_data = cache.get_summoner(summoner_id) if cache else None
+        if summoner_data is None:
+            summoner_url = f"https://vn2.api.riotgames.com/tft/summoner/v1/summoners/{summoner_id}"
+            summoner_response = client.get(summoner_url, method="summoner-by-id")
+            summoner_response.raise_for_status()
+            summoner_json = summoner_response.json()
+            summoner_data = {
+                "puuid": summoner_json.get("puuid"),
+                "summoner_level": summoner_json.get("summonerLevel"),
+                "profile_icon_id": summoner_json.get("profileIconId")
+            }
         
         # Get account details using puuid
         puuid = summoner_data.get("puuid")
         if puuid:
             account_url = f"https://asia.api.riotgames.com/riot/account/v1/accounts/by-puuid/{puuid}"
-            account_response = requests.get(account_url, headers=headers)
+            account_response = client.get(account_url, method="account-by-puuid")
             account_response.raise_for_status()
             account_data = account_response.json()
             
-            return {
+            details = {
                 "summoner_id": summoner_id,
                 "puuid": puuid,
                 "game_name": account_data.get("gameName"),
                 "tag_line": account_data.get("tagLine"),
-                "summoner_level": summoner_data.get("summonerLevel"),
-                "profile_icon_id": summoner_data.get("profileIconId")
+                "summoner_level": summoner_data.get("summoner_level"),
+                "profile_icon_id": summoner_data.get("profile_icon_id")
             }
+            
+            if cache:
+                cache.put(details)
+            
+            return details
         
     except requests.exceptions.RequestException as e:
         print(f"Error fetching player details for summoner {summoner_id}: {e}")
         
     return None
 
+def get_leaderboard_summoner_ids(leaderboard_data):
+    """
+    Collects the summoner IDs of every player on the ladder.
+    
+    Args:
+        leaderboard_data (dict): Raw leaderboard data from extract_leaderboard_data
+        
+    Returns:
+        list: Unique summoner IDs in tier order (challenger -> grandmaster -> master)
+    """
+    summoner_ids = []
+    seen = set()
+    
+    for tier in ["challenger", "grandmaster", "master"]:
+        for entry in leaderboard_data.get(tier, []):
+            summoner_id = entry.get("summonerId")
+            if summoner_id and summoner_id not in seen:
+                seen.add(summoner_id)
+                summoner_ids.append(summoner_id)
+    
+    return summoner_ids
+
+def resolve_player_details(summoner_ids, max_workers=None):
+    """
+    Resolves many summoner IDs to Riot IDs concurrently.
+    
+    Lookups run on a thread pool and all go through the shared Riot client,
+    so throughput is bounded by the API rate limits rather than by latency.
+    
+    Args:
+        summoner_ids (list): Summoner IDs to resolve
+        max_workers (int): Concurrent lookups (defaults to PLAYER_RESOLVE_WORKERS or 8)
+        
+    Returns:
+        dict: summoner_id -> player details, for every lookup that succeeded
+    """
+    if not summoner_ids:
+        return {}
+    
+    if max_workers is None:
+        max_workers = int(os.environ.get("PLAYER_RESOLVE_WORKERS", 8))
+    
+    player_details = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(extract_player_details_from_summoner_id, summoner_id): summoner_id
+            for summoner_id in summoner_ids
+        }
+        
+        for future in as_completed(futures):
+            details = future.result()
+            if details:
+                player_details[futures[future]] = details
+    
+    print(f"Resolved {len(player_details)}/{len(summoner_ids)} players to Riot IDs")
+    return player_details
+
 if __name__ == "__main__":
     tag_line = 'YBY1'
     game_name = 'TLN YBY1'
@@ -0,0 +1,233 @@
+"""
+Delta-encoded history of leaderboard snapshots.
+
+Each leaderboard load replaces leaderboard_entry, so the previous snapshot
+would otherwise be lost. Every load also records:
+- a leaderboard_snapshot row (snapshot_id, taken_at),
+- one leaderboard_snapshot_delta row per player whose LP, position, wins or
+  losses changed since their last recorded values,
+- the new values in leaderboard_player_state, which the next load diffs against.
+
+A player's values at any snapshot are the running sum of their deltas, so
+LP-movement and climb-rate queries only read the (small) delta rows. A player
+who drops off the ladder gets a delta that sets their position to 0. While
+a snapshot has entries whose PUUID could not be resolved, missing players may
+be among them, so they keep their previous values instead.
+"""
+
+from Steps.bulk_write import bulk_insert
+
+
+def ensure_leaderboard_history_tables(cursor):
+    """
+    Create the snapshot history tables if they don't exist.
+
+    Args:
+        cursor: Open database cursor
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS leaderboard_snapshot (
+        snapshot_id INT AUTO_INCREMENT PRIMARY KEY,
+        taken_at TIMESTAMP NOT NULL,
+        num_entries INT NOT NULL,
+        INDEX idx_taken_at (taken_at)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS leaderboard_snapshot_delta (
+        snapshot_id INT NOT NULL,
+        puuid VARCHAR(100) NOT NULL,
+        lp_delta INT NOT NULL DEFAULT 0,
+        position_delta INT NOT NULL DEFAULT 0,
+        wins_delta INT NOT NULL DEFAULT 0,
+        losses_delta INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (puuid, snapshot_id),
+        INDEX idx_snapshot (snapshot_id)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS leaderboard_player_state (
+        puuid VARCHAR(100) PRIMARY KEY,
+        lp INT NOT NULL,
+        position INT NOT NULL,
+        wins INT NOT NULL,
+        losses INT NOT NULL,
+        snapshot_id INT NOT NULL
+    )
+    """)
+
+
+def snapshot_states(leaderboard_entries):
+    """
+    Get the tracked values of every ladder player in a processed snapshot.
+
+    Args:
+        leaderboard_entries: Processed entries, either a list of dicts or the
+            columns returned by process_leaderboard_columns
+
+    Returns:
+        tuple: (states, unresolved) where states maps puuid -> (lp, position,
+        wins, losses) and unresolved counts the skipped entries without a PUUID
+    """
+    if isinstance(leaderboard_entries, dict):
+        columns = leaderboard_entries
+        rows = zip(columns['puuid'], columns['league_points'], columns['rank_position'],
+                   columns['wins'], columns['losses'])
+    else:
+        rows = ((entry.get('puuid'), entry['league_points'], entry['rank_position'],
+                 entry['wins'], entry['losses']) for entry in leaderboard_entries)
+
+    states = {}
+    unresolved = 0
+    for puuid, lp, position, wins, losses in rows:
+        if not puuid:
+            unresolved += 1
+        # Keep the best-ranked entry if a player appears twice
+        elif puuid not in states:
+            states[puuid] = (lp, position, wins, losses)
+    return states, unresolved
+
+
+def compute_leaderboard_deltas(previous, current, unresolved=0):
+    """
+    Diff two snapshots of player values.
+
+    Args:
+        previous (dict): puuid -> (lp, position, wins, losses) from the last snapshot
+        current (dict): puuid -> (lp, position, wins, losses) of the new snapshot
+        unresolved (int): Entries of the new snapshot without a PUUID; while
+            there are any, missing players are not recorded as dropping off
+
+    Returns:
+        list: (puuid, lp_delta, position_delta, wins_delta, losses_delta) for every
+        player that changed, joined or dropped off the ladder
+    """
+    deltas = []
+
+    for puuid, values in current.items():
+        before = previous.get(puuid, (0, 0, 0, 0))
+        if values != before:
+            deltas.append((puuid, *(now - then for now, then in zip(values, before))))
+
+    # A missing player may be one of the unresolved entries, e.g. after a
+    # failed Riot ID lookup; recording a drop-off would fake a leave and rejoin
+    if unresolved:
+        return deltas
+
+    # Dropped players keep their LP and record but leave the ladder (position 0)
+    for puuid, (lp, position, wins, losses) in previous.items():
+        if puuid not in current and position != 0:
+            deltas.append((puuid, 0, -position, 0, 0))
+
+    return deltas
+
+
+def updated_player_states(previous, current, deltas):
+    """
+    Get the new stored values of every player with a delta.
+
+    Args:
+        previous (dict): puuid -> (lp, position, wins, losses) from the last snapshot
+        current (dict): puuid -> (lp, position, wins, losses) of the new snapshot
+        deltas (list): Deltas returned by compute_leaderboard_deltas
+
+    Returns:
+        dict: puuid -> (lp, position, wins, losses); dropped players keep
+        their values with position 0
+    """
+    states = {}
+    for puuid, *_ in deltas:
+        if puuid in current:
+            states[puuid] = current[puuid]
+        else:
+            lp, _, wins, losses = previous[puuid]
+            states[puuid] = (lp, 0, wins, losses)
+    return states
+
+
+def append_leaderboard_snapshot(cursor, leaderboard_entries, taken_at, chunk_size=None):
+    """
+    Record a new snapshot and its per-player deltas.
+
+    Runs on the caller's cursor and transaction. Call it only after the
+    snapshot has gone live, so the history never holds one readers never saw;
+    it runs no DDL, so a rollback discards a partly written snapshot.
+
+    Args:
+        cursor: Open database cursor (the caller owns the transaction)
+        leaderboard_entries: Processed entries, a list of dicts or columns
+        taken_at (str): Snapshot time, '%Y-%m-%d %H:%M:%S'
+        chunk_size (int): Rows per multi-row statement (defaults to DB_BULK_CHUNK_SIZE)
+
+    Returns:
+        int: ID of the new snapshot
+    """
+    current, unresolved = snapshot_states(leaderboard_entries)
+
+    cursor.execute(
+        "INSERT INTO leaderboard_snapshot (taken_at, num_entries) VALUES (%s, %s)",
+        (taken_at, len(current))
+    )
+    snapshot_id = cursor.lastrowid
+
+    cursor.execute("SELECT puuid, lp, position, wins, losses FROM leaderboard_player_state")
+    previous = {
+        puuid: (lp, position, wins, losses)
+        for puuid, lp, position, wins, losses in cursor.fetchall()
+    }
+
+    deltas = compute_leaderboard_deltas(previous, current, unresolved)
+
+    bulk_insert(
+        cursor, 'leaderboard_snapshot_delta',
+        ['snapshot_id', 'puuid', 'lp_delta', 'position_delta', 'wins_delta', 'losses_delta'],
+        ((snapshot_id, *delta) for delta in deltas),
+        chunk_size=chunk_size
+    )
+
+    states = updated_player_states(previous, current, deltas)
+
+    bulk_insert(
+        cursor, 'leaderboard_player_state',
+        ['puuid', 'lp', 'position', 'wins', 'losses', 'snapshot_id'],
+        ((puuid, *values, snapshot_id) for puuid, values in states.items()),
+        update_columns=['lp', 'position', 'wins', 'losses', 'snapshot_id'],
+        chunk_size=chunk_size
+    )
+
+    print(f"Recorded leaderboard snapshot {snapshot_id}: {len(deltas)} changed players"
+          + (f", {unresolved} unresolved entries" if unresolved else ""))
+    return snapshot_id
+
+
+def get_player_snapshot_history(cursor, puuid, since=None):
+    """
+    Rebuild a player's ladder values at every snapshot where they changed.
+
+    Args:
+        cursor: Open database cursor
+        puuid (str): Player PUUID
+        since (str): Optional start time, '%Y-%m-%d %H:%M:%S'
+
+    Returns:
+        list: (taken_at, lp, position, wins, losses) tuples, oldest first
+    """
+    # Running sums over all deltas; the time filter is applied afterwards so
+    # values before `since` still count towards the totals
+    cursor.execute("""
+        SELECT taken_at, lp, position, wins, losses FROM (
+            SELECT s.taken_at,
+                   SUM(d.lp_delta) OVER w AS lp,
+                   SUM(d.position_delta) OVER w AS position,
+                   SUM(d.wins_delta) OVER w AS wins,
+                   SUM(d.losses_delta) OVER w AS losses
+            FROM leaderboard_snapshot_delta d
+            JOIN leaderboard_snapshot s ON s.snapshot_id = d.snapshot_id
+            WHERE d.puuid = %s
+            WINDOW w AS (ORDER BY d.snapshot_id)
+        ) history
+        WHERE %s IS NULL OR taken_at >= %s
+        ORDER BY taken_at
+    """, (puuid, since, since))
+
+    return cursor.fetchall()
@@ -1,157 +1,237 @@
-import mysql.connector
-import os
 from dotenv import load_dotenv
+from Steps.db_pool import get_connection
+from Steps.bulk_write import bulk_insert
+from Steps.leaderboard_history import ensure_leaderboard_history_tables, append_leaderboard_snapshot
 
 # Load environment variables
 load_dotenv()
 
-def load_to_sql(data):
+def load_to_sql(data, chunk_size=None):
     """
     Loads processed data into the new database schema (user and lp_history tables).
     
     Args:
         data (dict): Processed data containing User and LPHistory information
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
     """
-    # Connect to the database using environment variables
-    conn = mysql.connector.connect(
-        host=os.environ.get("DB_HOST"),
-        port=int(os.environ.get("DB_PORT")),
-        user=os.environ.get("DB_USER"),
-        password=os.environ.get("DB_PASSWORD"),
-        database=os.environ.get("DB_NAME")
-    )
+    load_players_to_sql([data], chunk_size)
+
+def load_players_to_sql(players_data, chunk_size=None):
+    """
+    Loads processed data for many players in one transaction on one pooled connection.
+    
+    All user rows are upserted and all LP history rows inserted with chunked
+    multi-row INSERTs, so a batch of thousands of players costs a handful of
+    round trips.
+    
+    Args:
+        players_data (list): Processed data dicts (as returned by process) containing
+            User and LPHistory information
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
+    """
+    players_data = [data for data in players_data if data]
+    if not players_data:
+        print("No player data to load")
+        return
+    
+    # Borrow a connection from the shared pool
+    conn = get_connection()
 
     cursor = conn.cursor()
 
-    # Get the data
-    user_data = data['User']
-    lp_history = data['LPHistory']
-
-    # Insert or update user data
-    cursor.execute("""
-        INSERT INTO user (id, username, tag, tier, `rank`, lp, wins, losses, games_played, 
-                         avg_placement, top4_rate, position, last_updated)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE 
-            username=VALUES(username), 
-            tag=VALUES(tag), 
-            tier=VALUES(tier), 
-            `rank`=VALUES(`rank`), 
-            lp=VALUES(lp), 
-            wins=VALUES(wins), 
-            losses=VALUES(losses), 
-            games_played=VALUES(games_played),
-            avg_placement=VALUES(avg_placement),
-            top4_rate=VALUES(top4_rate),
-            position=VALUES(position),
-            last_updated=VALUES(last_updated)
-    """, (
-        user_data['id'], user_data['username'], user_data['tag'], 
-        user_data['tier'], user_data['rank'], user_data['lp'],
-        user_data['wins'], user_data['losses'], user_data['games_played'],
-        user_data['avg_placement'], user_data['top4_rate'], 
-        user_data['position'], user_data['last_updated']
-    ))
-
-    # Insert LP history entries
-    for lp_entry in lp_history:
-        cursor.execute("""
-            INSERT IGNORE INTO lp_history (user_id, lp, timestamp)
-            VALUES (%s, %s, %s)
-        """, (lp_entry['user_id'], lp_entry['lp'], lp_entry['timestamp']))
+    try:
+        # Insert or update user data
+        user_columns = ['id', 'username', 'tag', 'tier', 'rank', 'lp', 'wins', 'losses',
+                        'games_played', 'avg_placement', 'top4_rate', 'position', 'last_updated']
+        bulk_insert(
+            cursor, 'user', user_columns,
+            (tuple(data['User'][column] for column in user_columns) for data in players_data),
+            update_columns=user_columns[1:],
+            chunk_size=chunk_size
+        )
 
-    print("Data loaded successfully into new schema.")
-    
-    # Commit all changes
-    conn.commit()
+        # Insert LP history entries in batches
+        bulk_insert(
+            cursor, 'lp_history', ['user_id', 'lp', 'timestamp'],
+            (
+                (lp_entry['user_id'], lp_entry['lp'], lp_entry['timestamp'])
+                for data in players_data
+                for lp_entry in data['LPHistory']
+            ),
+            ignore=True,
+            chunk_size=chunk_size
+        )
+
+        print(f"Data loaded successfully into new schema for {len(players_data)} players.")
+
+        # Commit all changes
+        conn.commit()
 
-    # Close connection
-    cursor.close()
-    conn.close()
+    finally:
+        # Return connection to the pool
+        cursor.close()
+        conn.close()
     
-def load_leaderboard_to_sql(leaderboard_entries):
+# Lock name used to serialize leaderboard refreshes across workers
+LEADERBOARD_REFRESH_LOCK = 'tft_leaderboard_refresh'
+
+def swap_in_shadow_table(cursor, table):
+    """
+    Atomically replace a table with its fully loaded shadow copy.
+
+    RENAME TABLE swaps both names in a single atomic operation, so readers
+    see either the complete old snapshot or the complete new one, never an
+    empty or half-loaded table.
+
+    Args:
+        cursor: Open database cursor
+        table (str): Live table name; the shadow is expected at <table>_shadow
+    """
+    shadow_table = f"{table}_shadow"
+    old_table = f"{table}_old"
+
+    cursor.execute(f"DROP TABLE IF EXISTS {old_table}")
+    cursor.execute(f"RENAME TABLE {table} TO {old_table}, {shadow_table} TO {table}")
+    cursor.execute(f"DROP TABLE IF EXISTS {old_table}")
+
+def leaderboard_rows(leaderboard_entries):
+    """
+    Rows for the leaderboard_entry table, in load_leaderboard_to_sql column order.
+
+    Args:
+        leaderboard_entries: Processed entries, either a list of dicts
+            (process_leaderboard_data) or columns (process_leaderboard_columns)
+
+    Returns:
+        iterator: One tuple per entry
+    """
+    if isinstance(leaderboard_entries, dict):
+        # Columnar snapshot: zip the columns instead of building dicts
+        columns = leaderboard_entries
+        size = len(columns['player_name'])
+        return zip(
+            columns['player_name'],
+            ['VN2'] * size,  # Default region for Vietnam server
+            columns['tier'],
+            columns['rank'],
+            columns['league_points'],
+            columns['wins'],
+            columns['losses'],
+            columns['games_played'],
+            columns['average_placement'],
+            columns['win_rate'],
+            columns['rank_position'],
+            [columns['last_updated']] * size
+        )
+
+    return ((
+        entry['player_name'],
+        'VN2',  # Default region for Vietnam server
+        entry['tier'],
+        entry['rank'],
+        entry['league_points'],
+        entry['wins'],
+        entry['losses'],
+        entry['games_played'],
+        entry['average_placement'],
+        entry['win_rate'],
+        entry['rank_position'],
+        entry['last_updated']
+    ) for entry in leaderboard_entries)
+
+def load_leaderboard_to_sql(leaderboard_entries, chunk_size=None):
     """
     Loads processed leaderboard data into the leaderboard_entry table.
+
+    The new snapshot is written to a shadow table and then swapped in with
+    RENAME TABLE, so the web app keeps reading the previous snapshot (without
+    waiting on row locks) until the new one is complete. Only once the swap
+    has succeeded are the per-player deltas appended to the snapshot history
+    (see Steps.leaderboard_history), so the history never records a snapshot
+    that did not go live.
     
     Args:
-        leaderboard_entries (list): List of processed leaderboard entries
+        leaderboard_entries: List of processed leaderboard entries, or the
+            columns returned by process_leaderboard_columns
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
     """
-    if not leaderboard_entries:
+    if not leaderboard_entries or (isinstance(leaderboard_entries, dict) and not leaderboard_entries['player_name']):
         print("No leaderboard entries to load")
         return
     
-    # Connect to the database using environment variables
-    conn = mysql.connector.connect(
-        host=os.environ.get("DB_HOST"),
-        port=int(os.environ.get("DB_PORT")),
-        user=os.environ.get("DB_USER"),
-        password=os.environ.get("DB_PASSWORD"),
-        database=os.environ.get("DB_NAME")
-    )
+    # Borrow a connection from the shared pool
+    conn = get_connection()
 
     cursor = conn.cursor()
 
     try:
-        # Clear existing leaderboard data (since it's a snapshot)
-        cursor.execute("DELETE FROM leaderboard_entry")
-        print("Cleared existing leaderboard data")
+        # Only one refresh may use the shadow table at a time
+        cursor.execute("SELECT GET_LOCK(%s, 60)", (LEADERBOARD_REFRESH_LOCK,))
+        if cursor.fetchone()[0] != 1:
+            print("Another leaderboard refresh is in progress, skipping load")
+            return
+
+        # DDL commits implicitly, so all tables are created before any rows are written
+        ensure_leaderboard_history_tables(cursor)
+
+        # Build the new snapshot in a shadow table with the same structure
+        cursor.execute("DROP TABLE IF EXISTS leaderboard_entry_shadow")
+        cursor.execute("CREATE TABLE leaderboard_entry_shadow LIKE leaderboard_entry")
         
-        # Insert new leaderboard entries
-        insert_query = """
-            INSERT INTO leaderboard_entry 
-            (username, leaderboard_region, tier, `rank`, lp, wins, losses, 
-             games_played, avg_placement, top4_rate, position, last_updated)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        # Insert new leaderboard entries in batches
+        loaded = bulk_insert(
+            cursor, 'leaderboard_entry_shadow',
+            ['username', 'leaderboard_region', 'tier', 'rank', 'lp', 'wins', 'losses',
+             'games_played', 'avg_placement', 'top4_rate', 'position', 'last_updated'],
+            leaderboard_rows(leaderboard_entries),
+            chunk_size=chunk_size
+        )
         
-        for entry in leaderboard_entries:
-            cursor.execute(insert_query, (
-                entry['player_name'],
-                'VN2',  # Default region for Vietnam server
-                entry['tier'],
-                entry['rank'],
-                entry['league_points'],
-                entry['wins'],
-                entry['losses'],
-                entry['games_played'],
-                entry['average_placement'],
-                entry['win_rate'],
-                entry['rank_position'],
-                entry['last_updated']
-            ))
+        # Commit the shadow table, then swap it in for readers
+        conn.commit()
+        swap_in_shadow_table(cursor, 'leaderboard_entry')
+        print(f"Successfully loaded {loaded} leaderboard entries")
         
-        # Commit all changes
+        # Record the snapshot now that it is live; if this fails the next
+        # run simply diffs against the last recorded snapshot
+        if isinstance(leaderboard_entries, dict):
+            taken_at = leaderboard_entries['last_updated']
+        else:
+            taken_at = leaderboard_entries[0]['last_updated']
+        append_leaderboard_snapshot(cursor, leaderboard_entries, taken_at, chunk_size=chunk_size)
         conn.commit()
-        print(f"Successfully loaded {len(leaderboard_entries)} leaderboard entries")
+
+        # On errors the lock is released by the session reset when the
+        # connection goes back to the pool
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (LEADERBOARD_REFRESH_LOCK,))
+        cursor.fetchall()
         
     except Exception as e:
         print(f"Error loading leaderboard data: {e}")
         conn.rollback()
         
     finally:
-        # Close connection
+        # Return connection to the pool
         cursor.close()
         conn.close()
 
-def load_match_companions_to_sql(companions):
+def load_match_companions_to_sql(companions, chunk_size=None):
     """
     Loads match companion data into the tft_match_companion table.
     
     Args:
         companions (list): List of companion entries with match IDs and player IDs
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
+        
+    Returns:
+        bool: True if the rows were committed (or there was nothing to load)
     """
     if not companions:
         print("No match companion data to load")
-        return
+        return True
     
-    # Connect to the database using environment variables
-    conn = mysql.connector.connect(
-        host=os.environ.get("DB_HOST"),
-        port=int(os.environ.get("DB_PORT")),
-        user=os.environ.get("DB_USER"),
-        password=os.environ.get("DB_PASSWORD"),
-        database=os.environ.get("DB_NAME")
-    )
+    # Borrow a connection from the shared pool
+    conn = get_connection()
 
     cursor = conn.cursor()
 
@@ -168,33 +248,32 @@ def load_match_companions_to_sql(companions):
         )
         """)
         
-        # Insert match companions
-        for companion in companions:
-            cursor.execute("""
-            INSERT INTO tft_match_companion 
-            (match_id, puuid, content_id, skin_id, placement)
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            content_id = VALUES(content_id),
-            skin_id = VALUES(skin_id),
-            placement = VALUES(placement)
-            """, (
+        # Insert match companions in batches
+        bulk_insert(
+            cursor, 'tft_match_companion',
+            ['match_id', 'puuid', 'content_id', 'skin_id', 'placement'],
+            ((
                 companion['match_id'],
                 companion['puuid'],
                 companion['content_id'],
                 companion['skin_id'],
                 companion['placement']
-            ))
+            ) for companion in companions),
+            update_columns=['content_id', 'skin_id', 'placement'],
+            chunk_size=chunk_size
+        )
         
         conn.commit()
         print(f"Successfully loaded {len(companions)} match companion entries")
+        return True
         
     except Exception as e:
         print(f"Error loading match companion data: {e}")
         conn.rollback()
+        return False
     
     finally:
-        # Close connection
+        # Return connection to the pool
         cursor.close()
         conn.close()
 
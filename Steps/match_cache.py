@@ -0,0 +1,219 @@
+"""
+Shared cache of TFT match details.
+
+A finished match never changes, and each one has eight participants, so
+when companion data is extracted for many ladder players the same match
+would otherwise be downloaded up to eight times. Every extractor fetches
+match details through fetch_match_details(), which checks:
+
+1. an in-memory LRU of recently used matches,
+2. an on-disk store of gzip-compressed JSON files, addressed by the
+   SHA-256 digest of the match ID,
+3. the Riot API (through the shared rate-limited client).
+
+Concurrent requests for the same match wait for a single download.
+
+Configuration (environment variables):
+- MATCH_CACHE_DIR: directory for the on-disk store (default "match_cache")
+- MATCH_CACHE_MEMORY_SIZE: matches kept in memory (default 1024)
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from Steps.riot_client import get_riot_client
+
+# Load environment variables
+load_dotenv()
+
+
+class MatchCache:
+    """
+    Two-level (memory LRU + disk) cache of match detail payloads.
+    """
+
+    def __init__(self, cache_dir=None, max_memory_entries=None):
+        self.cache_dir = cache_dir or os.environ.get("MATCH_CACHE_DIR", "match_cache")
+        self.max_memory_entries = int(max_memory_entries or os.environ.get("MATCH_CACHE_MEMORY_SIZE", 1024))
+
+        self.memory = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def _path(self, match_id):
+        """Location of a match on disk, sharded by the first byte of its digest"""
+        digest = hashlib.sha256(match_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json.gz")
+
+    def _remember(self, match_id, match_data):
+        """Add a match to the in-memory LRU, evicting the oldest if full"""
+        self.memory[match_id] = match_data
+        self.memory.move_to_end(match_id)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def _read_disk(self, match_id):
+        path = self._path(match_id)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Discarding unreadable cached match {match_id}: {e}")
+            return None
+
+    def _write_disk(self, match_id, match_data):
+        """Persist a match; best-effort, so a full or read-only disk never loses a download"""
+        path = self._path(match_id)
+
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(match_data, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error caching match {match_id} on disk: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def get(self, match_id):
+        """
+        Get a cached match without fetching it.
+
+        Args:
+            match_id (str): Riot match ID
+
+        Returns:
+            dict: Match details, or None if not cached
+        """
+        with self.lock:
+            if match_id in self.memory:
+                self.memory.move_to_end(match_id)
+                return self.memory[match_id]
+
+        match_data = self._read_disk(match_id)
+        if match_data is not None:
+            with self.lock:
+                self._remember(match_id, match_data)
+        return match_data
+
+    def get_or_fetch(self, match_id, fetch):
+        """
+        Get a match from the cache, calling fetch(match_id) at most once on a miss.
+
+        Args:
+            match_id (str): Riot match ID
+            fetch (callable): Downloads the match details for a match ID
+
+        Returns:
+            dict: Match details
+        """
+        match_data = self.get(match_id)
+        if match_data is not None:
+            return match_data
+
+        with self.lock:
+            event = self.in_flight.get(match_id)
+            is_owner = event is None
+            if is_owner:
+                event = self.in_flight[match_id] = threading.Event()
+
+        if not is_owner:
+            # Another thread is downloading this match; use its result
+            event.wait()
+            match_data = self.get(match_id)
+            if match_data is not None:
+                return match_data
+            return self.get_or_fetch(match_id, fetch)
+
+        try:
+            match_data = fetch(match_id)
+            self._write_disk(match_id, match_data)
+            with self.lock:
+                self._remember(match_id, match_data)
+            return match_data
+        finally:
+            with self.lock:
+                del self.in_flight[match_id]
+            event.set()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_match_cache():
+    """
+    Get the process-wide match cache, creating it on first use.
+
+    Returns:
+        MatchCache: The shared cache
+    """
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = MatchCache()
+
+    return _cache
+
+
+def fetch_match_details(match_id, region="vn2"):
+    """
+    Get the details of a match, downloading it only if it is not cached.
+
+    Args:
+        match_id (str): Match ID to retrieve
+        region (str): Region/platform ID (e.g., "vn2", "kr", "jp1")
+
+    Returns:
+        dict: Match details from the TFT match API
+
+    Raises:
+        requests.exceptions.RequestException: If the download fails
+    """
+    def download(match_id):
+        url = f"https://{region}.api.riotgames.com/tft/match/v1/matches/{match_id}"
+        response = get_riot_client().get(url, method="match-by-id")
+        response.raise_for_status()
+        return response.json()
+
+    return get_match_cache().get_or_fetch(match_id, download)
+
+
+def companions_from_match(match_data, match_id):
+    """
+    Extract the companion (Little Legend) of every participant in a match.
+
+    Args:
+        match_data (dict): Match details from the TFT match API
+        match_id (str): Match ID
+
+    Returns:
+        list: One companion entry per participant
+    """
+    companions = []
+
+    for participant in match_data.get('info', {}).get('participants', []):
+        companion_data = participant.get('companion', {})
+        if companion_data:
+            companions.append({
+                'match_id': match_id,
+                'puuid': participant.get('puuid'),
+                'content_id': companion_data.get('content_ID'),
+                'skin_id': companion_data.get('skin_ID'),
+                'placement': participant.get('placement')
+            })
+
+    return companions
@@ -0,0 +1,231 @@
+"""
+Batch ETL for all tracked players.
+
+Instead of one DAG run per hardcoded player, the batch pipeline:
+1. collects the tracked players (registered users plus ladder players),
+2. streams their profiles concurrently with a bounded thread pool,
+3. processes each profile while it downloads,
+4. loads every player in one pooled bulk write.
+
+Configuration (environment variables):
+- PLAYER_BATCH_WORKERS: concurrent profile extractions (default 4); the
+  sharded DAG gives each running shard a share of PLAYER_ETL_TOTAL_WORKERS
+- APP_DB_NAME: database of the web app; when set, registered users are read
+  from its `user` table (riot_name, riot_tag) instead of the ETL `user` table
+"""
+
+import os
+import hashlib
+import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from Steps.db_pool import get_connection
+from Steps.extract import (
+    stream_data_from_api, extract_leaderboard_data,
+    get_leaderboard_summoner_ids, resolve_player_details
+)
+from Steps.process import process
+from Steps.load import load_players_to_sql
+
+
+def get_registered_players():
+    """
+    Get the Riot IDs of all registered players.
+
+    Returns:
+        list: (game_name, tag_line) tuples
+    """
+    app_db_name = os.environ.get("APP_DB_NAME")
+
+    if app_db_name:
+        query = f"SELECT riot_name, riot_tag FROM `{app_db_name}`.user"
+    else:
+        query = "SELECT username, tag FROM user"
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(query)
+        return [(game_name, tag_line) for game_name, tag_line in cursor.fetchall()]
+
+    except Exception as e:
+        print(f"Error reading registered players: {e}")
+        return []
+
+    finally:
+        # Return connection to the pool
+        cursor.close()
+        conn.close()
+
+
+def get_ladder_players():
+    """
+    Get the Riot IDs of every player currently on the Master+ ladder.
+
+    Lookups go through the persistent player cache, so only new or renamed
+    ladder players cost API calls.
+
+    Returns:
+        list: (game_name, tag_line) tuples
+    """
+    leaderboard_data = extract_leaderboard_data()
+    if not leaderboard_data:
+        return []
+
+    player_details = resolve_player_details(get_leaderboard_summoner_ids(leaderboard_data))
+    return [
+        (details['game_name'], details['tag_line'])
+        for details in player_details.values()
+        if details.get('game_name') and details.get('tag_line')
+    ]
+
+
+def get_tracked_players(ladder_players=None, include_registered=True):
+    """
+    Merge registered and ladder players into one deduplicated list.
+
+    Args:
+        ladder_players (list): (game_name, tag_line) tuples of ladder players
+        include_registered (bool): Whether to include registered users
+
+    Returns:
+        list: Unique (game_name, tag_line) tuples, registered players first
+    """
+    players = []
+    seen = set()
+
+    sources = []
+    if include_registered:
+        sources.append(get_registered_players())
+    if ladder_players:
+        sources.append(ladder_players)
+
+    for source in sources:
+        for game_name, tag_line in source:
+            # Riot IDs are case-insensitive
+            key = (game_name.lower(), tag_line.lower())
+            if key not in seen:
+                seen.add(key)
+                players.append((game_name, tag_line))
+
+    print(f"Tracking {len(players)} players")
+    return players
+
+
+def partition_players(players, num_shards):
+    """
+    Split players into shards by a stable hash of their Riot ID.
+
+    The same player always lands in the same shard, so shard sizes and
+    retries stay predictable from one run to the next.
+
+    Args:
+        players (list): (game_name, tag_line) tuples
+        num_shards (int): Number of shards
+
+    Returns:
+        list: num_shards lists of (game_name, tag_line) tuples
+    """
+    num_shards = max(1, int(num_shards))
+    shards = [[] for _ in range(num_shards)]
+
+    for game_name, tag_line in players:
+        key = f"{game_name.lower()}#{tag_line.lower()}".encode("utf-8")
+        shard = int.from_bytes(hashlib.md5(key).digest()[:4], "big") % num_shards
+        shards[shard].append((game_name, tag_line))
+
+    return shards
+
+
+def extract_and_process_player(game_name, tag_line, session=None, num_matches=50):
+    """
+    Stream one player's profile straight into process().
+
+    Args:
+        game_name (str): The game name of the player
+        tag_line (str): The tag line of the player
+        session (requests.Session): Optional keep-alive session
+        num_matches (int): Number of recent matches to process
+
+    Returns:
+        dict: Processed data, or None if extraction or processing failed
+    """
+    extracted = stream_data_from_api(tag_line, game_name, session, num_matches)
+    if not extracted:
+        print(f"No data extracted for {game_name}#{tag_line}")
+        return None
+
+    return process(extracted[0], game_name, tag_line, num_matches)
+
+
+def extract_and_process_players(players, max_workers=None, num_matches=50):
+    """
+    Extract and process many players with bounded concurrency.
+
+    At most max_workers profiles are in flight, and each one is processed
+    while it streams in, so raw payloads are never held in memory.
+
+    Args:
+        players (list): (game_name, tag_line) tuples
+        max_workers (int): Concurrent extractions (defaults to PLAYER_BATCH_WORKERS or 4)
+        num_matches (int): Number of recent matches to process per player
+
+    Returns:
+        list: Processed data dicts, one per successfully extracted player
+    """
+    if max_workers is None:
+        max_workers = int(os.environ.get("PLAYER_BATCH_WORKERS", 4))
+
+    processed_players = []
+    remaining = iter(players)
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def submit_next():
+            player = next(remaining, None)
+            if player is None:
+                return
+            game_name, tag_line = player
+            pending[executor.submit(
+                extract_and_process_player, game_name, tag_line, session, num_matches
+            )] = player
+
+        for _ in range(max_workers):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                game_name, tag_line = pending.pop(future)
+                submit_next()
+
+                try:
+                    processed = future.result()
+                except Exception as e:
+                    print(f"Error extracting {game_name}#{tag_line}: {e}")
+                    continue
+
+                if processed:
+                    processed_players.append(processed)
+
+    print(f"Processed {len(processed_players)}/{len(players)} players")
+    return processed_players
+
+
+def run_player_batch(players, max_workers=None, num_matches=50):
+    """
+    Run the full extract -> process -> load pipeline for many players.
+
+    Args:
+        players (list): (game_name, tag_line) tuples
+        max_workers (int): Concurrent extractions
+        num_matches (int): Number of recent matches to process per player
+
+    Returns:
+        int: Number of players loaded
+    """
+    processed_players = extract_and_process_players(players, max_workers, num_matches)
+    load_players_to_sql(processed_players)
+    return len(processed_players)
@@ -0,0 +1,223 @@
+"""
+Persistent cache of summoner ID -> PUUID -> Riot ID mappings.
+
+Ladder players rarely change names between runs, so resolved lookups are
+kept in a small SQLite database that survives across DAG runs and workers.
+
+- summoner ID -> PUUID never changes, so that mapping is kept indefinitely.
+- PUUID -> Riot ID (game name + tag line) expires after a TTL, and is
+  replaced immediately whenever an API response shows a newer name for the
+  PUUID (or dropped when a lookup succeeds under a different name).
+
+Configuration (environment variables):
+- PLAYER_CACHE_PATH: SQLite file location (default "player_cache.sqlite3")
+- PLAYER_CACHE_TTL_HOURS: how long a Riot ID is trusted (default 72)
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+class PlayerCache:
+    """
+    SQLite-backed cache shared by all threads of a process.
+    """
+
+    def __init__(self, path=None, ttl_hours=None):
+        self.path = path or os.environ.get("PLAYER_CACHE_PATH", "player_cache.sqlite3")
+        ttl_hours = float(ttl_hours if ttl_hours is not None else os.environ.get("PLAYER_CACHE_TTL_HOURS", 72))
+        self.ttl_seconds = ttl_hours * 3600
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+
+        with self.lock, self.conn:
+            # WAL lets several Airflow workers read while one writes
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS summoner_account (
+                    summoner_id TEXT PRIMARY KEY,
+                    puuid TEXT NOT NULL,
+                    summoner_level INTEGER,
+                    profile_icon_id INTEGER,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS riot_id (
+                    puuid TEXT PRIMARY KEY,
+                    game_name TEXT,
+                    tag_line TEXT,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+
+    def get(self, summoner_id):
+        """
+        Get fresh cached player details for a summoner.
+
+        Args:
+            summoner_id (str): The summoner ID
+
+        Returns:
+            dict: Player details in the same shape as
+            extract_player_details_from_summoner_id, or None if the summoner
+            is unknown or its Riot ID has expired
+        """
+        with self.lock:
+            row = self.conn.execute("""
+                SELECT s.summoner_id, s.puuid, s.summoner_level, s.profile_icon_id,
+                       r.game_name, r.tag_line, r.fetched_at
+                FROM summoner_account s
+                JOIN riot_id r ON r.puuid = s.puuid
+                WHERE s.summoner_id = ?
+            """, (summoner_id,)).fetchone()
+
+        if row is None or time.time() - row["fetched_at"] > self.ttl_seconds:
+            return None
+
+        return {
+            "summoner_id": row["summoner_id"],
+            "puuid": row["puuid"],
+            "game_name": row["game_name"],
+            "tag_line": row["tag_line"],
+            "summoner_level": row["summoner_level"],
+            "profile_icon_id": row["profile_icon_id"]
+        }
+
+    def get_summoner(self, summoner_id):
+        """
+        Get the cached summoner record (PUUID, level, icon), ignoring the Riot ID TTL.
+
+        Args:
+            summoner_id (str): The summoner ID
+
+        Returns:
+            dict: summoner_id, puuid, summoner_level, profile_icon_id, or None
+        """
+        with self.lock:
+            row = self.conn.execute("""
+                SELECT summoner_id, puuid, summoner_level, profile_icon_id
+                FROM summoner_account WHERE summoner_id = ?
+            """, (summoner_id,)).fetchone()
+
+        return dict(row) if row else None
+
+    def put(self, details):
+        """
+        Store the result of a successful summoner + account lookup.
+
+        Args:
+            details (dict): Player details from extract_player_details_from_summoner_id
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO summoner_account
+                (summoner_id, puuid, summoner_level, profile_icon_id, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (details["summoner_id"], details["puuid"], details.get("summoner_level"),
+                  details.get("profile_icon_id"), now))
+            self.conn.execute("""
+                INSERT OR REPLACE INTO riot_id (puuid, game_name, tag_line, fetched_at)
+                VALUES (?, ?, ?, ?)
+            """, (details["puuid"], details.get("game_name"), details.get("tag_line"), now))
+
+    def record_riot_id(self, puuid, game_name, tag_line):
+        """
+        Record a Riot ID as an API response spells it (e.g. a profile lookup).
+
+        If the PUUID was cached under a different name, the stale name is
+        replaced so the next leaderboard run picks up the rename.
+
+        Args:
+            puuid (str): Player PUUID
+            game_name (str): Current game name
+            tag_line (str): Current tag line
+
+        Returns:
+            bool: True if the cached name changed
+        """
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT game_name, tag_line FROM riot_id WHERE puuid = ?", (puuid,)
+            ).fetchone()
+            changed = row is not None and (row["game_name"], row["tag_line"]) != (game_name, tag_line)
+
+            self.conn.execute("""
+                INSERT OR REPLACE INTO riot_id (puuid, game_name, tag_line, fetched_at)
+                VALUES (?, ?, ?, ?)
+            """, (puuid, game_name, tag_line, time.time()))
+
+        if changed:
+            print(f"Riot ID changed for {puuid}: {row['game_name']}#{row['tag_line']} -> {game_name}#{tag_line}")
+        return changed
+
+    def check_riot_id(self, puuid, game_name, tag_line):
+        """
+        Check a Riot ID a lookup succeeded with against the cached one.
+
+        Riot IDs are case-insensitive, so a name typed as "foo#vn2" still finds
+        "Foo#VN2" and must not replace its casing. A name that differs beyond
+        case means the player was renamed; the cached entry is dropped so the
+        next lookup fetches the new Riot ID in its real casing from Riot.
+
+        Args:
+            puuid (str): Player PUUID
+            game_name (str): Game name the lookup was made with
+            tag_line (str): Tag line the lookup was made with
+
+        Returns:
+            bool: True if the cached name was outdated and dropped
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT game_name, tag_line FROM riot_id WHERE puuid = ?", (puuid,)
+            ).fetchone()
+
+        if row is None or (row["game_name"] or "").casefold() == game_name.casefold() \
+                and (row["tag_line"] or "").casefold() == tag_line.casefold():
+            return False
+
+        print(f"Riot ID changed for {puuid}: {row['game_name']}#{row['tag_line']} -> {game_name}#{tag_line}")
+        self.invalidate(puuid)
+        return True
+
+    def invalidate(self, puuid):
+        """
+        Drop the cached Riot ID for a PUUID so it is fetched again.
+
+        Args:
+            puuid (str): Player PUUID
+        """
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM riot_id WHERE puuid = ?", (puuid,))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_player_cache():
+    """
+    Get the process-wide player cache, opening it on first use.
+
+    Returns:
+        PlayerCache: The shared cache
+    """
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PlayerCache()
+
+    return _cache
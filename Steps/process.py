@@ -1,7 +1,152 @@
-import json
 import requests
 import re
 import datetime
+import heapq
+from functools import lru_cache
+import numpy as np
+from Steps.debug_sink import dump_debug
+
+# Number of consecutive matches in each rolling statistic
+ROLLING_WINDOW = 10
+
+# Tier, optional division and LP, e.g. "CHALLENGER I 1942 LP" or "MASTER 300 LP"
+RATING_PATTERN = re.compile(r'\s*([A-Za-z_]+)(?:\s+(IV|I{1,3})\b)?\D*?(\d+)')
+
+# Distinct rating strings kept by parse_rating; a ladder run sees a few thousand
+RATING_CACHE_SIZE = 8192
+
+@lru_cache(maxsize=RATING_CACHE_SIZE)
+def parse_rating(rating_text):
+    """
+    Parse tier, rank, and LP from rating text like "CHALLENGER I 1942 LP".
+    
+    The same rating strings repeat across matches and players, so results
+    are memoized.
+    
+    Args:
+        rating_text (str): Rating text to parse
+        
+    Returns:
+        tuple: (tier, rank, lp); rank is '' when the text has no division,
+        and ("UNRANKED", "", 0) is returned for text without LP
+    """
+    match = RATING_PATTERN.match(rating_text or '')
+    if not match:
+        return "UNRANKED", "", 0
+    
+    tier, rank, lp = match.groups()
+    return tier, rank or '', int(lp)
+
+def match_columns(matches):
+    """
+    Collect the per-match fields used by process() into NumPy arrays.
+    
+    Args:
+        matches (iterable): Match dicts from the metatft profile
+        
+    Returns:
+        tuple: (placements, timestamps in ms, LP) as int64 arrays
+    """
+    placements = []
+    timestamps = []
+    lps = []
+    
+    for match in matches:
+        placements.append(match['placement'])
+        timestamps.append(match['match_timestamp'])
+        lps.append(parse_rating(match['summary']['player_rating'])[2])
+    
+    return (
+        np.array(placements, dtype=np.int64),
+        np.array(timestamps, dtype=np.int64),
+        np.array(lps, dtype=np.int64)
+    )
+
+def format_timestamps(timestamps_ms):
+    """
+    Format epoch-millisecond timestamps as local 'YYYY-MM-DD HH:MM:SS' strings.
+    
+    Matches the output of datetime.fromtimestamp(ts / 1000).strftime(...) but
+    formats the whole array at once. The local UTC offset is applied in one
+    step when it is the same at the start and end of every day that holds a
+    timestamp; otherwise (a DST or other offset change on one of those days,
+    or different offsets on different days) each timestamp is formatted on
+    its own.
+    
+    Args:
+        timestamps_ms (np.ndarray): Timestamps in milliseconds since the epoch
+        
+    Returns:
+        list: Formatted timestamps
+    """
+    if not len(timestamps_ms):
+        return []
+    
+    seconds = timestamps_ms // 1000
+    
+    # Some zones change offset twice within weeks (e.g. around Ramadan), so
+    # the offset is checked on every day with a match, not just the endpoints
+    day_starts = np.unique(seconds // 86400) * 86400
+    offsets = {
+        datetime.datetime.fromtimestamp(ts).astimezone().utcoffset()
+        for day_start in day_starts.tolist()
+        for ts in (day_start, day_start + 86399)
+    }
+    
+    if len(offsets) != 1:
+        return [
+            datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+            for ts in seconds.tolist()
+        ]
+    
+    local = (seconds + int(offsets.pop().total_seconds())).astype('datetime64[s]')
+    return np.char.replace(np.datetime_as_string(local, unit='s'), 'T', ' ').tolist()
+
+def compute_match_stats(placements, window=ROLLING_WINDOW):
+    """
+    Compute placement statistics over a player's recent matches.
+    
+    Args:
+        placements (np.ndarray): Placement (1-8) of each match
+        window (int): Number of consecutive matches in each rolling statistic
+        
+    Returns:
+        dict: wins, losses, avg_placement, top4_rate, placement_histogram
+            (count of each placement 1-8), rolling_avg_placement and
+            rolling_top4_rate (one value per full window, in match order)
+    """
+    num_games = len(placements)
+    if not num_games:
+        return {
+            'wins': 0,
+            'losses': 0,
+            'avg_placement': 8.0,
+            'top4_rate': 0.0,
+            'placement_histogram': [0] * 8,
+            'rolling_avg_placement': [],
+            'rolling_top4_rate': []
+        }
+    
+    # Top 4 counts as a win, bottom 4 as a loss
+    top4 = placements <= 4
+    wins = int(np.count_nonzero(top4))
+    
+    rolling_avg_placement = []
+    rolling_top4_rate = []
+    if num_games >= window:
+        kernel = np.full(window, 1.0 / window)
+        rolling_avg_placement = np.round(np.convolve(placements, kernel, 'valid'), 2).tolist()
+        rolling_top4_rate = np.round(np.convolve(top4, kernel, 'valid'), 2).tolist()
+    
+    return {
+        'wins': wins,
+        'losses': num_games - wins,
+        'avg_placement': float(placements.mean()),
+        'top4_rate': wins / num_games,
+        'placement_histogram': np.bincount(np.clip(placements, 1, 8), minlength=9)[1:].tolist(),
+        'rolling_avg_placement': rolling_avg_placement,
+        'rolling_top4_rate': rolling_top4_rate
+    }
 
 def process(data, game_name, tag_line, num_matches=50):
     """
@@ -9,7 +154,8 @@ def process(data, game_name, tag_line, num_matches=50):
     for the new database schema.
 
     Args:
-        data (dict): The extracted data from the API in JSON format.
+        data (dict): The extracted data from the API in JSON format; 'matches' may
+            also be a generator, as returned by extract.stream_data_from_api.
         game_name (str): The game name of the player.
         tag_line (str): The tag line of the player.
         num_matches (int): Number of recent matches to process.
@@ -33,57 +179,36 @@ def process(data, game_name, tag_line, num_matches=50):
                 - last_updated (str): Timestamp of last update.
             
             LPHistory (list): A list of LP history entries for tracking LP changes over time.
+            
+            MatchStats (dict): Placement histogram and rolling statistics, see compute_match_stats.
         
     """
     try:
+        # Streamed profiles (extract.stream_data_from_api) already stop at
+        # num_matches and only fill in the player fields once fully consumed,
+        # so the matches are read before anything else
+        matches = data['matches']
+        if isinstance(matches, list):
+            matches = matches[:num_matches]
+        
+        # Calculate statistics from recent matches in columnar form
+        placements, timestamps, match_lps = match_columns(matches)
+        stats = compute_match_stats(placements)
+        
         # Extract basic player information
         puuid = data['summoner']['puuid']
         username = game_name
         tag = tag_line
-        lp = int(re.findall(r'\d+', data['ranked']['rating_text'])[0])
         games_played = int(data['ranked']['num_games'])
         
-        # Extract tier and rank information from rating_text
-        rating_text = data['ranked']['rating_text']  # e.g., "CHALLENGER I 1942 LP"
-        
-        # Parse tier and rank from rating text
-        rating_parts = rating_text.split()
-        if len(rating_parts) >= 2:
-            tier = rating_parts[0]  # e.g., "CHALLENGER", "GRANDMASTER", "MASTER", "DIAMOND", etc.
-            rank = rating_parts[1]  # e.g., "I", "II", "III", "IV" (or empty for CHALLENGER/GRANDMASTER)
-        else:
-            tier = 'UNRANKED'
-            rank = ''
-        
-        # Calculate statistics from recent matches
-        placements = []
-        wins = 0
-        losses = 0
-        lp_history = []
-        
-        for i, match in enumerate(data['matches'][:num_matches]):
-            placement = match['placement']
-            placements.append(placement)
-            
-            # Count wins (top 4) and losses (bottom 4)
-            if placement <= 4:
-                wins += 1
-            else:
-                losses += 1
-            
-            # Extract LP for history tracking
-            match_lp = int(re.findall(r'\d+', match['summary']['player_rating'])[0])
-            match_timestamp = datetime.datetime.fromtimestamp(match['match_timestamp'] / 1000)
-            
-            lp_history.append({
-                'user_id': puuid,
-                'lp': match_lp,
-                'timestamp': match_timestamp.strftime('%Y-%m-%d %H:%M:%S')
-            })
+        # Parse tier, rank and LP from rating text, e.g. "CHALLENGER I 1942 LP"
+        tier, rank, lp = parse_rating(data['ranked']['rating_text'])
         
-        # Calculate derived statistics
-        avg_placement = sum(placements) / len(placements) if placements else 8.0
-        top4_rate = (wins / len(placements)) if placements else 0.0
+        # LP history for tracking LP changes over time
+        lp_history = [
+            {'user_id': puuid, 'lp': match_lp, 'timestamp': timestamp}
+            for match_lp, timestamp in zip(match_lps.tolist(), format_timestamps(timestamps))
+        ]
         
         # Position would typically come from leaderboard API, defaulting to 0 for now
         position = 0
@@ -99,11 +224,11 @@ def process(data, game_name, tag_line, num_matches=50):
             'tier': tier,
             'rank': rank,
             'lp': lp,
-            'wins': wins,
-            'losses': losses,
+            'wins': stats['wins'],
+            'losses': stats['losses'],
             'games_played': games_played,
-            'avg_placement': round(avg_placement, 2),
-            'top4_rate': round(top4_rate, 2),
+            'avg_placement': round(stats['avg_placement'], 2),
+            'top4_rate': round(stats['top4_rate'], 2),
             'position': position,
             'last_updated': last_updated
         }
@@ -111,12 +236,16 @@ def process(data, game_name, tag_line, num_matches=50):
         # Prepare output for new schema
         output = {
             'User': user_data,
-            'LPHistory': lp_history
+            'LPHistory': lp_history,
+            'MatchStats': {
+                'placement_histogram': stats['placement_histogram'],
+                'rolling_avg_placement': stats['rolling_avg_placement'],
+                'rolling_top4_rate': stats['rolling_top4_rate']
+            }
         }
         
         # Save processed data for debugging
-        with open("processed_data.json", "w") as f:
-            json.dump(output, f, indent=4)
+        dump_debug("processed_data", output, key=f"{game_name}#{tag_line}")
             
         return output
                 
@@ -124,110 +253,199 @@ def process(data, game_name, tag_line, num_matches=50):
         print(f"Error processing data: {e}")
         return None
 
-def process_leaderboard_data(leaderboard_data, player_details_cache=None):
+# Ladder tiers, highest first
+LEADERBOARD_TIERS = ["challenger", "grandmaster", "master"]
+
+# Average placement is estimated from the win (top 4) rate: below 0.2 -> 6.5,
+# 0.2-0.4 -> 5.5, 0.4-0.6 -> 4.5, 0.6 and above -> 3.5
+PLACEMENT_BUCKET_EDGES = np.array([0.2, 0.4, 0.6])
+PLACEMENT_BUCKET_VALUES = np.array([6.5, 5.5, 4.5, 3.5])
+
+def leaderboard_sort_key(tier_index, entry):
     """
-    Processes the extracted leaderboard data and formats it for the leaderboard_entry table.
+    Ladder order of a raw league entry: tier, then LP, wins and fewest games.
+    
+    Args:
+        tier_index (int): Index of the entry's tier in LEADERBOARD_TIERS
+        entry (dict): League entry from the Riot API
+        
+    Returns:
+        tuple: Key that sorts the highest-ranked entry first
+    """
+    wins = entry.get("wins", 0)
+    return (tier_index, -entry.get("leaguePoints", 0), -wins, wins + entry.get("losses", 0))
+
+# Processed leaderboard columns, in the order of a leaderboard entry
+LEADERBOARD_COLUMNS = [
+    'player_name', 'tagline', 'puuid', 'tier', 'rank', 'league_points', 'wins', 'losses',
+    'games_played', 'average_placement', 'win_rate', 'rank_position'
+]
+
+def process_leaderboard_columns(leaderboard_data, player_details_cache=None):
+    """
+    Processes the whole ladder at once into columns for the leaderboard_entry table.
+    
+    Games played, win rate, the placement estimate and positions are computed
+    as array operations over all tiers, and the snapshot gets a single
+    last_updated timestamp. Entries are ranked with a stable sort in
+    leaderboard_sort_key order, since the API returns each tier unsorted.
     
     Args:
         leaderboard_data (dict): Raw leaderboard data from Riot API containing challenger, grandmaster, master tiers
-        player_details_cache (dict): Optional cache of player details to avoid redundant API calls
+        player_details_cache (dict): Optional summoner_id -> player details mapping, e.g. from
+            extract.resolve_player_details, used to fill in real Riot IDs
         
     Returns:
-        list: List of formatted leaderboard entries ready for database insertion
+        dict: One list per name in LEADERBOARD_COLUMNS (all the same length),
+        plus 'last_updated' for the whole snapshot; None if processing failed
     """
     if not leaderboard_data:
         print("No leaderboard data to process")
-        return []
-    
-    processed_entries = []
-    current_position = 1
+        return None
     
     if player_details_cache is None:
         player_details_cache = {}
     
     try:
-        # Process each tier in order: challenger -> grandmaster -> master
-        for tier in ["challenger", "grandmaster", "master"]:
-            tier_entries = leaderboard_data.get(tier, [])
-            
+        entries = []
+        tier_index = []
+        
+        # Merge the tiers in order: challenger -> grandmaster -> master
+        for index, tier in enumerate(LEADERBOARD_TIERS):
+            tier_entries = [entry for entry in leaderboard_data.get(tier, []) if entry.get("summonerId")]
             print(f"Processing {tier} tier: {len(tier_entries)} players")
-            
-            for entry in tier_entries:
-                summoner_id = entry.get("summonerId")
-                if not summoner_id:
-                    continue
-                
-                # Get player details (riot ID) if not cached
-                if summoner_id not in player_details_cache:
-                    # This would require API call - for now use placeholder
-                    player_details_cache[summoner_id] = {
-                        "game_name": f"Player_{summoner_id[:8]}",
-                        "tag_line": "NA1"
-                    }
-                
-                player_details = player_details_cache[summoner_id]
-                
-                # Extract leaderboard information
-                league_points = entry.get("leaguePoints", 0)
-                wins = entry.get("wins", 0)
-                losses = entry.get("losses", 0)
-                games_played = wins + losses
-                
-                # Calculate win rate and average placement
-                win_rate = round((wins / games_played), 2) if games_played > 0 else 0.0
-                
-                # For TFT, "wins" in leaderboard context usually means top 4 finishes
-                # Average placement estimation based on win rate (this is an approximation)
-                if win_rate >= 0.6:
-                    avg_placement = 3.5
-                elif win_rate >= 0.4:
-                    avg_placement = 4.5
-                elif win_rate >= 0.2:
-                    avg_placement = 5.5
-                else:
-                    avg_placement = 6.5
-                
-                # Determine rank based on tier
-                if tier.upper() == "CHALLENGER":
-                    rank = "I"
-                elif tier.upper() == "GRANDMASTER":
-                    rank = "I"
-                else:  # MASTER
-                    rank = "I"
-                
-                # Current timestamp
-                last_updated = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                
-                # Create leaderboard entry
-                leaderboard_entry = {
-                    'player_name': player_details.get("game_name", "Unknown"),
-                    'tagline': player_details.get("tag_line", "Unknown"),
-                    'tier': tier.upper(),
-                    'rank': rank,
-                    'league_points': league_points,
-                    'wins': wins,
-                    'losses': losses,
-                    'games_played': games_played,
-                    'average_placement': avg_placement,
-                    'win_rate': win_rate,
-                    'rank_position': current_position,
-                    'last_updated': last_updated
-                }
-                
-                processed_entries.append(leaderboard_entry)
-                current_position += 1
+            entries.extend(tier_entries)
+            tier_index.extend([index] * len(tier_entries))
+        
+        tier_index = np.array(tier_index, dtype=np.int64)
+        league_points = np.array([entry.get("leaguePoints", 0) for entry in entries], dtype=np.int64)
+        wins = np.array([entry.get("wins", 0) for entry in entries], dtype=np.int64)
+        losses = np.array([entry.get("losses", 0) for entry in entries], dtype=np.int64)
+        games_played = wins + losses
+        
+        # Rank by tier, then LP, wins and fewest games (the last lexsort key
+        # is the primary one); lexsort is stable, so full ties keep API order
+        order = np.lexsort((games_played, -wins, -league_points, tier_index))
+        entries = [entries[i] for i in order.tolist()]
+        tier_index, league_points, wins, losses, games_played = (
+            tier_index[order], league_points[order], wins[order], losses[order], games_played[order]
+        )
+        
+        # Fall back to a placeholder when the Riot ID lookup failed
+        details = [
+            player_details_cache.get(entry["summonerId"]) or {
+                "game_name": f"Player_{entry['summonerId'][:8]}",
+                "tag_line": "NA1"
+            }
+            for entry in entries
+        ]
+        
+        # For TFT, "wins" in leaderboard context usually means top 4 finishes
+        # (Python's round() is correctly rounded; np.round can differ on ties like 0.465)
+        win_rate = np.divide(wins, games_played, out=np.zeros(len(entries)), where=games_played > 0)
+        win_rate = np.array([round(rate, 2) for rate in win_rate.tolist()])
+        
+        # Average placement estimation based on win rate (this is an approximation)
+        average_placement = PLACEMENT_BUCKET_VALUES[np.digitize(win_rate, PLACEMENT_BUCKET_EDGES)]
+        
+        columns = {
+            'player_name': [player.get("game_name", "Unknown") for player in details],
+            'tagline': [player.get("tag_line", "Unknown") for player in details],
+            # Newer league entries carry the PUUID; otherwise it comes from the lookup
+            'puuid': [entry.get("puuid") or player.get("puuid") for entry, player in zip(entries, details)],
+            'tier': [LEADERBOARD_TIERS[index].upper() for index in tier_index.tolist()],
+            # Master+ tiers have a single division
+            'rank': ["I"] * len(entries),
+            'league_points': league_points.tolist(),
+            'wins': wins.tolist(),
+            'losses': losses.tolist(),
+            'games_played': games_played.tolist(),
+            'average_placement': average_placement.tolist(),
+            'win_rate': win_rate.tolist(),
+            'rank_position': np.arange(1, len(entries) + 1).tolist(),
+            'last_updated': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
         
-        print(f"Successfully processed {len(processed_entries)} leaderboard entries")
+        print(f"Successfully processed {len(entries)} leaderboard entries")
         
         # Save processed leaderboard data for debugging
-        with open("processed_leaderboard_data.json", "w") as f:
-            json.dump(processed_entries, f, indent=4)
+        dump_debug("processed_leaderboard_data", columns)
         
-        return processed_entries
+        return columns
         
     except Exception as e:
         print(f"Error processing leaderboard data: {e}")
+        return None
+
+def top_leaderboard_columns(leaderboard_data, k=50, player_details_cache=None):
+    """
+    Processes only the top k players of the ladder, e.g. for the homepage.
+    
+    The top entries are selected with a bounded heap in O(n log k) instead of
+    sorting the whole ladder, then processed like process_leaderboard_columns.
+    
+    Args:
+        leaderboard_data (dict): Raw leaderboard data from Riot API containing challenger, grandmaster, master tiers
+        k (int): Number of players to keep
+        player_details_cache (dict): Optional summoner_id -> player details mapping
+        
+    Returns:
+        dict: Columns as returned by process_leaderboard_columns, with positions 1..k
+    """
+    if not leaderboard_data:
+        print("No leaderboard data to process")
+        return None
+    
+    candidates = (
+        (index, entry)
+        for index, tier in enumerate(LEADERBOARD_TIERS)
+        for entry in leaderboard_data.get(tier, [])
+        if entry.get("summonerId")
+    )
+    
+    # nsmallest is stable, so ties keep API order as in the full ranking
+    top = heapq.nsmallest(k, candidates, key=lambda candidate: leaderboard_sort_key(*candidate))
+    
+    top_data = {tier: [] for tier in LEADERBOARD_TIERS}
+    for index, entry in top:
+        top_data[LEADERBOARD_TIERS[index]].append(entry)
+    
+    return process_leaderboard_columns(top_data, player_details_cache)
+
+def leaderboard_entries_from_columns(columns):
+    """
+    Convert processed leaderboard columns into one dict per entry.
+    
+    Args:
+        columns (dict): Output of process_leaderboard_columns
+        
+    Returns:
+        list: Leaderboard entry dicts, each with a 'last_updated' field
+    """
+    if not columns:
         return []
+    
+    return [
+        dict(zip(LEADERBOARD_COLUMNS, values), last_updated=columns['last_updated'])
+        for values in zip(*(columns[name] for name in LEADERBOARD_COLUMNS))
+    ]
+
+def process_leaderboard_data(leaderboard_data, player_details_cache=None):
+    """
+    Processes the extracted leaderboard data and formats it for the leaderboard_entry table.
+    
+    Row-oriented wrapper around process_leaderboard_columns; loaders should
+    prefer the columns, which load_leaderboard_to_sql accepts directly.
+    
+    Args:
+        leaderboard_data (dict): Raw leaderboard data from Riot API containing challenger, grandmaster, master tiers
+        player_details_cache (dict): Optional summoner_id -> player details mapping, e.g. from
+            extract.resolve_player_details, used to fill in real Riot IDs
+        
+    Returns:
+        list: List of formatted leaderboard entries ready for database insertion
+    """
+    return leaderboard_entries_from_columns(process_leaderboard_columns(leaderboard_data, player_details_cache))
 
 def parse_rating_from_text(rating_text):
     """
@@ -239,14 +457,4 @@ def parse_rating_from_text(rating_text):
     Returns:
         tuple: (tier, rank, lp)
     """
-    try:
-        parts = rating_text.split()
-        if len(parts) >= 3:
-            tier = parts[0]
-            rank = parts[1] 
-            lp = int(re.findall(r'\d+', ' '.join(parts[2:]))[0])
-            return tier, rank, lp
-    except:
-        pass
-    
-    return "UNRANKED", "", 0
\ No newline at end of file
+    return parse_rating(rating_text)
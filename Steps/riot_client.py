@@ -0,0 +1,277 @@
+"""
+Rate-limit-aware client for the Riot Games API.
+
+All Steps extractors send their Riot API requests through one shared
+RiotClient. The client keeps a bucket of rate-limit windows per routing
+region (e.g. "vn2" and "asia", which Riot limits independently) and per
+(region, method), schedules each request so no window is exceeded, keeps the
+windows in sync with the X-App-Rate-Limit / X-Method-Rate-Limit response
+headers, and honours Retry-After when a 429 does slip through.
+
+Configuration (environment variables):
+- RIOT_API_KEY: API key sent as X-Riot-Token
+- API_RATE_LIMIT_REQUESTS, API_RATE_LIMIT_SECONDS: long app window used
+  until the first response reports the real limits (default 100:120)
+- API_MAX_RETRIES: retries for 429 and 5xx responses (default 3)
+- API_RATE_LIMIT_BUDGET: share of the API key's limits this process may use
+  (default 1.0); workers that split one key set it to 1/N
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Riot development keys also allow 20 requests per second
+DEFAULT_BURST_LIMIT = "20:1"
+
+
+def parse_rate_limit_header(value):
+    """
+    Parse a Riot rate limit header such as "20:1,100:120".
+
+    Args:
+        value (str): Header value of comma separated "count:seconds" pairs
+
+    Returns:
+        list: (count, seconds) tuples
+    """
+    limits = []
+    if not value:
+        return limits
+
+    for part in value.split(","):
+        count, _, seconds = part.strip().partition(":")
+        if count.isdigit() and seconds.isdigit():
+            limits.append((int(count), int(seconds)))
+
+    return limits
+
+
+class RateLimitBucket:
+    """
+    Sliding-window rate limits for one region or one method.
+
+    Each window remembers the send times of its recent requests, so a request
+    is only allowed once every window has room for it. This never lets more
+    than `limit` requests into any `seconds` span, which is how Riot counts.
+    Not thread-safe on its own; RiotClient serializes access.
+    """
+
+    def __init__(self, limits):
+        self.windows = {}
+        self.blocked_until = 0.0
+        self.update_limits(limits)
+
+    def update_limits(self, limits):
+        """Replace the window sizes, keeping already recorded requests"""
+        windows = {}
+        for limit, seconds in limits:
+            previous = self.windows.get(seconds)
+            sent = previous[1] if previous else deque()
+            windows[seconds] = (limit, sent)
+        self.windows = windows
+
+    def sync_counts(self, counts, now):
+        """
+        Catch up with the request counts reported by the server.
+
+        Requests made by other processes sharing the same API key only show up
+        in the *-Rate-Limit-Count headers, so missing ones are recorded as sent now.
+        """
+        for count, seconds in counts:
+            if seconds not in self.windows:
+                continue
+            _, sent = self.windows[seconds]
+            self._purge(sent, seconds, now)
+            for _ in range(count - len(sent)):
+                sent.append(now)
+
+    def block(self, until):
+        """Refuse all requests until the given monotonic time"""
+        self.blocked_until = max(self.blocked_until, until)
+
+    def wait_time(self, now):
+        """Seconds until a request fits in every window (0 if it fits now)"""
+        wait = max(0.0, self.blocked_until - now)
+        for seconds, (limit, sent) in self.windows.items():
+            self._purge(sent, seconds, now)
+            if len(sent) >= limit:
+                wait = max(wait, sent[len(sent) - limit] + seconds - now)
+        return wait
+
+    def record(self, now):
+        """Record a request sent at the given time"""
+        for _, sent in self.windows.values():
+            sent.append(now)
+
+    @staticmethod
+    def _purge(sent, seconds, now):
+        while sent and sent[0] <= now - seconds:
+            sent.popleft()
+
+
+class RiotClient:
+    """
+    Shared HTTP client for Riot API requests with per-region rate limiting.
+    """
+
+    def __init__(self, api_key=None, max_retries=None, budget_fraction=None):
+        self.api_key = api_key or os.environ.get("RIOT_API_KEY")
+        self.max_retries = int(max_retries if max_retries is not None else os.environ.get("API_MAX_RETRIES", 3))
+
+        self.session = requests.Session()
+        if self.api_key:
+            self.session.headers.update({"X-Riot-Token": self.api_key})
+
+        long_window = f"{os.environ.get('API_RATE_LIMIT_REQUESTS', 100)}:{os.environ.get('API_RATE_LIMIT_SECONDS', 120)}"
+        self.default_app_limits = parse_rate_limit_header(f"{DEFAULT_BURST_LIMIT},{long_window}")
+
+        self.app_buckets = {}
+        self.method_buckets = {}
+        self.lock = threading.Lock()
+
+        if budget_fraction is None:
+            budget_fraction = float(os.environ.get("API_RATE_LIMIT_BUDGET", 1.0))
+        self.set_budget_fraction(budget_fraction)
+
+    def set_budget_fraction(self, fraction):
+        """
+        Limit this client to a share of the API key's rate limits.
+
+        When several workers share one key, each one uses 1/N of every
+        window so that together they stay within the key's limits.
+
+        Args:
+            fraction (float): Share of the limits to use, in (0, 1]
+        """
+        with self.lock:
+            self.budget_fraction = min(1.0, max(fraction, 0.0001))
+            # Buckets are rebuilt with the new share on their next use
+            self.app_buckets = {}
+            self.method_buckets = {}
+
+    def _scale(self, limits):
+        """Apply the budget share to (count, seconds) limits or counts"""
+        if self.budget_fraction >= 1.0:
+            return limits
+        return [(max(1, int(count * self.budget_fraction)), seconds) for count, seconds in limits]
+
+    @staticmethod
+    def get_region(url):
+        """Routing region of a Riot API URL, e.g. "vn2" or "asia" """
+        return urlparse(url).hostname.split(".")[0]
+
+    def _buckets(self, region, method):
+        """Get (creating if needed) the buckets that limit a request"""
+        app_bucket = self.app_buckets.get(region)
+        if app_bucket is None:
+            app_bucket = self.app_buckets[region] = RateLimitBucket(self._scale(self.default_app_limits))
+
+        buckets = [app_bucket]
+        if method:
+            method_bucket = self.method_buckets.get((region, method))
+            if method_bucket is None:
+                # Method limits are unknown until the first response
+                method_bucket = self.method_buckets[(region, method)] = RateLimitBucket([])
+            buckets.append(method_bucket)
+
+        return buckets
+
+    def _acquire(self, region, method):
+        """Block until the request may be sent without exceeding any limit"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                buckets = self._buckets(region, method)
+                wait = max(bucket.wait_time(now) for bucket in buckets)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.record(now)
+                    return
+            time.sleep(wait)
+
+    def _update_from_headers(self, region, method, response):
+        """Sync buckets with the limits and counts reported by Riot"""
+        headers = response.headers
+        with self.lock:
+            now = time.monotonic()
+            app_bucket, *method_bucket = self._buckets(region, method)
+
+            if "X-App-Rate-Limit" in headers:
+                # Counts cover every worker on the key, so they are scaled like the limits
+                app_bucket.update_limits(self._scale(parse_rate_limit_header(headers["X-App-Rate-Limit"])))
+                app_bucket.sync_counts(self._scale(parse_rate_limit_header(headers.get("X-App-Rate-Limit-Count"))), now)
+
+            if method_bucket and "X-Method-Rate-Limit" in headers:
+                method_bucket[0].update_limits(self._scale(parse_rate_limit_header(headers["X-Method-Rate-Limit"])))
+                method_bucket[0].sync_counts(self._scale(parse_rate_limit_header(headers.get("X-Method-Rate-Limit-Count"))), now)
+
+            if response.status_code == 429:
+                retry_after = float(headers.get("Retry-After", 1))
+                limit_type = headers.get("X-Rate-Limit-Type", "application")
+                if limit_type == "method" and method_bucket:
+                    method_bucket[0].block(now + retry_after)
+                else:
+                    # Application and service limits hold back the whole region
+                    app_bucket.block(now + retry_after)
+
+    def get(self, url, method=None, params=None):
+        """
+        Send a rate-limited GET request to the Riot API.
+
+        Args:
+            url (str): Full Riot API URL
+            method (str): Name of the API method, used to track method limits
+            params (dict): Optional query parameters
+
+        Returns:
+            requests.Response: The final response (callers should still call
+            raise_for_status() to handle non-retryable errors)
+        """
+        region = self.get_region(url)
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire(region, method)
+            response = self.session.get(url, params=params)
+            self._update_from_headers(region, method, response)
+
+            if response.status_code == 429:
+                print(f"Rate limited on {region} ({method or 'app'}), retrying after {response.headers.get('Retry-After', 1)}s")
+                continue
+
+            if response.status_code >= 500 and attempt < self.max_retries:
+                time.sleep(2 ** attempt)
+                continue
+
+            return response
+
+        return response
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_riot_client():
+    """
+    Get the process-wide Riot API client, creating it on first use.
+
+    Returns:
+        RiotClient: The shared client
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RiotClient()
+
+    return _client
@@ -12,8 +12,10 @@ import os
 import json
 import requests
 from dotenv import load_dotenv
-import mysql.connector
 from datetime import datetime
+from Steps.db_pool import get_connection
+from Steps.bulk_write import bulk_insert
+from Steps.match_cache import fetch_match_details, companions_from_match
 
 # Load environment variables
 load_dotenv(r"VinUni_database_project_tft_analyzer\.env")
@@ -280,25 +282,20 @@ def process_augments_data(augments_data, version):
     
     return processed_augments
 
-def load_champions_to_sql(champions):
+def load_champions_to_sql(champions, chunk_size=None):
     """
     Load processed champion data into the database.
     
     Args:
         champions (list): List of processed champion entries
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
     """
     if not champions:
         print("No champion data to load")
         return
     
-    # Connect to database
-    conn = mysql.connector.connect(
-        host=os.environ.get("DB_HOST"),
-        port=int(os.environ.get("DB_PORT")),
-        user=os.environ.get("DB_USER"),
-        password=os.environ.get("DB_PASSWORD"),
-        database=os.environ.get("DB_NAME")
-    )
+    # Borrow a connection from the shared pool
+    conn = get_connection()
     
     cursor = conn.cursor()
     
@@ -317,21 +314,11 @@ def load_champions_to_sql(champions):
         )
         """)
         
-        # Insert champions
-        for champion in champions:
-            cursor.execute("""
-            INSERT INTO tft_champion 
-            (champion_id, name, tier, cost, image_url, traits, version, last_updated)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            name = VALUES(name),
-            tier = VALUES(tier),
-            cost = VALUES(cost),
-            image_url = VALUES(image_url),
-            traits = VALUES(traits),
-            version = VALUES(version),
-            last_updated = VALUES(last_updated)
-            """, (
+        # Insert champions in batches
+        bulk_insert(
+            cursor, 'tft_champion',
+            ['champion_id', 'name', 'tier', 'cost', 'image_url', 'traits', 'version', 'last_updated'],
+            ((
                 champion['champion_id'],
                 champion['name'],
                 champion['tier'],
@@ -340,7 +327,10 @@ def load_champions_to_sql(champions):
                 champion['traits'],
                 champion['version'],
                 champion['last_updated']
-            ))
+            ) for champion in champions),
+            update_columns=['name', 'tier', 'cost', 'image_url', 'traits', 'version', 'last_updated'],
+            chunk_size=chunk_size
+        )
         
         conn.commit()
         print(f"Successfully loaded {len(champions)} champion entries")
@@ -350,28 +340,24 @@ def load_champions_to_sql(champions):
         conn.rollback()
     
     finally:
+        # Return connection to the pool
         cursor.close()
         conn.close()
 
-def load_tacticians_to_sql(tacticians):
+def load_tacticians_to_sql(tacticians, chunk_size=None):
     """
     Load processed tactician data into the database.
     
     Args:
         tacticians (list): List of processed tactician entries
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
     """
     if not tacticians:
         print("No tactician data to load")
         return
     
-    # Connect to database
-    conn = mysql.connector.connect(
-        host=os.environ.get("DB_HOST"),
-        port=int(os.environ.get("DB_PORT")),
-        user=os.environ.get("DB_USER"),
-        password=os.environ.get("DB_PASSWORD"),
-        database=os.environ.get("DB_NAME")
-    )
+    # Borrow a connection from the shared pool
+    conn = get_connection()
     
     cursor = conn.cursor()
     
@@ -389,20 +375,11 @@ def load_tacticians_to_sql(tacticians):
         )
         """)
         
-        # Insert tacticians
-        for tactician in tacticians:
-            cursor.execute("""
-            INSERT INTO tft_tactician 
-            (tactician_id, name, species, level, image_url, version, last_updated)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            name = VALUES(name),
-            species = VALUES(species),
-            level = VALUES(level),
-            image_url = VALUES(image_url),
-            version = VALUES(version),
-            last_updated = VALUES(last_updated)
-            """, (
+        # Insert tacticians in batches
+        bulk_insert(
+            cursor, 'tft_tactician',
+            ['tactician_id', 'name', 'species', 'level', 'image_url', 'version', 'last_updated'],
+            ((
                 tactician['tactician_id'],
                 tactician['name'],
                 tactician['species'],
@@ -410,7 +387,10 @@ def load_tacticians_to_sql(tacticians):
                 tactician['image_url'],
                 tactician['version'],
                 tactician['last_updated']
-            ))
+            ) for tactician in tacticians),
+            update_columns=['name', 'species', 'level', 'image_url', 'version', 'last_updated'],
+            chunk_size=chunk_size
+        )
         
         conn.commit()
         print(f"Successfully loaded {len(tacticians)} tactician entries")
@@ -420,28 +400,24 @@ def load_tacticians_to_sql(tacticians):
         conn.rollback()
     
     finally:
+        # Return connection to the pool
         cursor.close()
         conn.close()
 
-def load_items_to_sql(items):
+def load_items_to_sql(items, chunk_size=None):
     """
     Load processed item data into the database.
     
     Args:
         items (list): List of processed item entries
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
     """
     if not items:
         print("No item data to load")
         return
     
-    # Connect to database
-    conn = mysql.connector.connect(
-        host=os.environ.get("DB_HOST"),
-        port=int(os.environ.get("DB_PORT")),
-        user=os.environ.get("DB_USER"),
-        password=os.environ.get("DB_PASSWORD"),
-        database=os.environ.get("DB_NAME")
-    )
+    # Borrow a connection from the shared pool
+    conn = get_connection()
     
     cursor = conn.cursor()
     
@@ -458,26 +434,21 @@ def load_items_to_sql(items):
         )
         """)
         
-        # Insert items
-        for item in items:
-            cursor.execute("""
-            INSERT INTO tft_item 
-            (item_id, name, description, image_url, version, last_updated)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            name = VALUES(name),
-            description = VALUES(description),
-            image_url = VALUES(image_url),
-            version = VALUES(version),
-            last_updated = VALUES(last_updated)
-            """, (
+        # Insert items in batches
+        bulk_insert(
+            cursor, 'tft_item',
+            ['item_id', 'name', 'description', 'image_url', 'version', 'last_updated'],
+            ((
                 item['item_id'],
                 item['name'],
                 item['description'],
                 item['image_url'],
                 item['version'],
                 item['last_updated']
-            ))
+            ) for item in items),
+            update_columns=['name', 'description', 'image_url', 'version', 'last_updated'],
+            chunk_size=chunk_size
+        )
         
         conn.commit()
         print(f"Successfully loaded {len(items)} item entries")
@@ -487,28 +458,24 @@ def load_items_to_sql(items):
         conn.rollback()
     
     finally:
+        # Return connection to the pool
         cursor.close()
         conn.close()
 
-def load_traits_to_sql(traits):
+def load_traits_to_sql(traits, chunk_size=None):
     """
     Load processed trait data into the database.
     
     Args:
         traits (list): List of processed trait entries
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
     """
     if not traits:
         print("No trait data to load")
         return
     
-    # Connect to database
-    conn = mysql.connector.connect(
-        host=os.environ.get("DB_HOST"),
-        port=int(os.environ.get("DB_PORT")),
-        user=os.environ.get("DB_USER"),
-        password=os.environ.get("DB_PASSWORD"),
-        database=os.environ.get("DB_NAME")
-    )
+    # Borrow a connection from the shared pool
+    conn = get_connection()
     
     cursor = conn.cursor()
     
@@ -525,26 +492,21 @@ def load_traits_to_sql(traits):
         )
         """)
         
-        # Insert traits
-        for trait in traits:
-            cursor.execute("""
-            INSERT INTO tft_trait 
-            (trait_id, name, description, image_url, version, last_updated)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            name = VALUES(name),
-            description = VALUES(description),
-            image_url = VALUES(image_url),
-            version = VALUES(version),
-            last_updated = VALUES(last_updated)
-            """, (
+        # Insert traits in batches
+        bulk_insert(
+            cursor, 'tft_trait',
+            ['trait_id', 'name', 'description', 'image_url', 'version', 'last_updated'],
+            ((
                 trait['trait_id'],
                 trait['name'],
                 trait['description'],
                 trait['image_url'],
                 trait['version'],
                 trait['last_updated']
-            ))
+            ) for trait in traits),
+            update_columns=['name', 'description', 'image_url', 'version', 'last_updated'],
+            chunk_size=chunk_size
+        )
         
         conn.commit()
         print(f"Successfully loaded {len(traits)} trait entries")
@@ -554,28 +516,24 @@ def load_traits_to_sql(traits):
         conn.rollback()
     
     finally:
+        # Return connection to the pool
         cursor.close()
         conn.close()
 
-def load_augments_to_sql(augments):
+def load_augments_to_sql(augments, chunk_size=None):
     """
     Load processed augment data into the database.
     
     Args:
         augments (list): List of processed augment entries
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
     """
     if not augments:
         print("No augment data to load")
         return
     
-    # Connect to database
-    conn = mysql.connector.connect(
-        host=os.environ.get("DB_HOST"),
-        port=int(os.environ.get("DB_PORT")),
-        user=os.environ.get("DB_USER"),
-        password=os.environ.get("DB_PASSWORD"),
-        database=os.environ.get("DB_NAME")
-    )
+    # Borrow a connection from the shared pool
+    conn = get_connection()
     
     cursor = conn.cursor()
     
@@ -593,20 +551,11 @@ def load_augments_to_sql(augments):
         )
         """)
         
-        # Insert augments
-        for augment in augments:
-            cursor.execute("""
-            INSERT INTO tft_augment 
-            (augment_id, name, description, image_url, tier, version, last_updated)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            name = VALUES(name),
-            description = VALUES(description),
-            image_url = VALUES(image_url),
-            tier = VALUES(tier),
-            version = VALUES(version),
-            last_updated = VALUES(last_updated)
-            """, (
+        # Insert augments in batches
+        bulk_insert(
+            cursor, 'tft_augment',
+            ['augment_id', 'name', 'description', 'image_url', 'tier', 'version', 'last_updated'],
+            ((
                 augment['augment_id'],
                 augment['name'],
                 augment['description'],
@@ -614,7 +563,10 @@ def load_augments_to_sql(augments):
                 augment['tier'],
                 augment['version'],
                 augment['last_updated']
-            ))
+            ) for augment in augments),
+            update_columns=['name', 'description', 'image_url', 'tier', 'version', 'last_updated'],
+            chunk_size=chunk_size
+        )
         
         conn.commit()
         print(f"Successfully loaded {len(augments)} augment entries")
@@ -624,6 +576,7 @@ def load_augments_to_sql(augments):
         conn.rollback()
     
     finally:
+        # Return connection to the pool
         cursor.close()
         conn.close()
 
@@ -644,50 +597,30 @@ def extract_match_companions(match_id, region="vn2"):
             print("Missing RIOT_API_KEY in environment variables")
             return []
             
-        url = f"https://{region}.api.riotgames.com/tft/match/v1/matches/{match_id}?api_key={api_key}"
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        match_data = response.json()
-        companions = []
+        # Each match is downloaded once and shared through the match cache
+        match_data = fetch_match_details(match_id, region)
         
         # Extract companion data for each participant
-        for participant in match_data.get('info', {}).get('participants', []):
-            companion_data = participant.get('companion', {})
-            if companion_data:
-                companions.append({
-                    'match_id': match_id,
-                    'puuid': participant.get('puuid'),
-                    'content_id': companion_data.get('content_ID'),
-                    'skin_id': companion_data.get('skin_ID'),
-                    'placement': participant.get('placement')
-                })
-        
-        return companions
+        return companions_from_match(match_data, match_id)
         
     except Exception as e:
         print(f"Error extracting match companion data: {e}")
         return []
 
-def load_match_companions_to_sql(companions):
+def load_match_companions_to_sql(companions, chunk_size=None):
     """
     Load match companion data into the database.
     
     Args:
         companions (list): List of match companion entries
+        chunk_size (int): Rows per multi-row INSERT (defaults to DB_BULK_CHUNK_SIZE)
     """
     if not companions:
         print("No match companion data to load")
         return
     
-    # Connect to database
-    conn = mysql.connector.connect(
-        host=os.environ.get("DB_HOST"),
-        port=int(os.environ.get("DB_PORT")),
-        user=os.environ.get("DB_USER"),
-        password=os.environ.get("DB_PASSWORD"),
-        database=os.environ.get("DB_NAME")
-    )
+    # Borrow a connection from the shared pool
+    conn = get_connection()
     
     cursor = conn.cursor()
     
@@ -704,23 +637,20 @@ def load_match_companions_to_sql(companions):
         )
         """)
         
-        # Insert match companions
-        for companion in companions:
-            cursor.execute("""
-            INSERT INTO tft_match_companion 
-            (match_id, puuid, content_id, skin_id, placement)
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            content_id = VALUES(content_id),
-            skin_id = VALUES(skin_id),
-            placement = VALUES(placement)
-            """, (
+        # Insert match companions in batches
+        bulk_insert(
+            cursor, 'tft_match_companion',
+            ['match_id', 'puuid', 'content_id', 'skin_id', 'placement'],
+            ((
                 companion['match_id'],
                 companion['puuid'],
                 companion['content_id'],
                 companion['skin_id'],
                 companion['placement']
-            ))
+            ) for companion in companions),
+            update_columns=['content_id', 'skin_id', 'placement'],
+            chunk_size=chunk_size
+        )
         
         conn.commit()
         print(f"Successfully loaded {len(companions)} match companion entries")
@@ -730,6 +660,7 @@ def load_match_companions_to_sql(companions):
         conn.rollback()
     
     finally:
+        # Return connection to the pool
         cursor.close()
         conn.close()
 
@@ -0,0 +1,126 @@
+"""
+Per-player high-water marks for incremental match-history sync.
+
+For every PUUID the match_sync_state table remembers the newest match that
+has already been extracted. Incremental runs pass its timestamp to the
+match-history endpoint as startTime, so only newer games are fetched and
+processed.
+"""
+
+from Steps.db_pool import get_connection
+from Steps.bulk_write import bulk_insert
+
+
+def ensure_sync_state_table(cursor):
+    """
+    Create the match_sync_state table if it doesn't exist.
+
+    Args:
+        cursor: Open database cursor
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS match_sync_state (
+        puuid VARCHAR(100) PRIMARY KEY,
+        last_match_id VARCHAR(20) NOT NULL,
+        last_match_timestamp BIGINT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """)
+
+
+def get_sync_states(puuids):
+    """
+    Get the high-water marks of several players.
+
+    Args:
+        puuids (list): Player PUUIDs
+
+    Returns:
+        dict: puuid -> {'last_match_id', 'last_match_timestamp'} for players
+        that have been synced before
+    """
+    if not puuids:
+        return {}
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        ensure_sync_state_table(cursor)
+        placeholders = ", ".join(["%s"] * len(puuids))
+        cursor.execute(f"""
+            SELECT puuid, last_match_id, last_match_timestamp
+            FROM match_sync_state WHERE puuid IN ({placeholders})
+        """, list(puuids))
+
+        return {
+            puuid: {'last_match_id': last_match_id, 'last_match_timestamp': last_match_timestamp}
+            for puuid, last_match_id, last_match_timestamp in cursor.fetchall()
+        }
+
+    finally:
+        # Return connection to the pool
+        cursor.close()
+        conn.close()
+
+
+def get_sync_state(puuid):
+    """
+    Get the high-water mark of a single player.
+
+    Args:
+        puuid (str): Player PUUID
+
+    Returns:
+        dict: {'last_match_id', 'last_match_timestamp'}, or None if never synced
+    """
+    return get_sync_states([puuid]).get(puuid)
+
+
+def update_sync_states(states):
+    """
+    Advance the high-water marks of several players.
+
+    A mark only moves forward: an older timestamp never replaces a newer one.
+
+    Args:
+        states (dict): puuid -> {'last_match_id', 'last_match_timestamp'}
+    """
+    if not states:
+        return
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        ensure_sync_state_table(cursor)
+
+        rows = [
+            (puuid, state['last_match_id'], state['last_match_timestamp'])
+            for puuid, state in states.items()
+        ]
+
+        # Only move a mark forward; last_match_id is assigned first because
+        # MySQL evaluates the assignments left to right
+        bulk_insert(
+            cursor, 'match_sync_state',
+            ['puuid', 'last_match_id', 'last_match_timestamp'],
+            rows,
+            on_duplicate="""
+            last_match_id = IF(VALUES(last_match_timestamp) > last_match_timestamp,
+                               VALUES(last_match_id), last_match_id),
+            last_match_timestamp = GREATEST(last_match_timestamp, VALUES(last_match_timestamp))
+            """
+        )
+
+        conn.commit()
+        print(f"Updated match sync state for {len(rows)} players")
+
+    except Exception as e:
+        print(f"Error updating match sync state: {e}")
+        conn.rollback()
+
+    finally:
+        # Return connection to the pool
+        cursor.close()
+        conn.close()
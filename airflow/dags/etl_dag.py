@@ -7,9 +7,9 @@ from airflow.providers.standard.operators.python import PythonOperator
 # Add the project root to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from Steps.extract import extract_data_from_api
-from Steps.process import process
-from Steps.load import load_to_sql
+from Steps.player_batch import get_tracked_players, get_ladder_players, extract_and_process_players
+from Steps.load import load_players_to_sql
+from Steps.artifact_store import put_artifact, get_artifact
 
 default_args = {
     'owner': 'airflow',
@@ -21,21 +21,21 @@ default_args = {
     'start_date': datetime(2025, 5, 26),
 }
 
-def extract_task(**kwargs):
-    # Example player info - you might want to parameterize this
-    tag_line = 'YBY1'
-    game_name = 'TLN YBY1'
-    return extract_data_from_api(tag_line, game_name)
+def collect_players_task(**kwargs):
+    """Collect registered and ladder players to track"""
+    return put_artifact(get_tracked_players(ladder_players=get_ladder_players()))
 
-def process_task(**kwargs):
+def extract_process_task(**kwargs):
+    """Extract and process all tracked players with bounded concurrency"""
     ti = kwargs['ti']
-    data, game_name, tag_line = ti.xcom_pull(task_ids='extract')
-    return process(data, game_name, tag_line)
+    players = get_artifact(ti.xcom_pull(task_ids='collect_players'), [])
+    return put_artifact(extract_and_process_players(players))
 
 def load_task(**kwargs):
+    """Load all processed players in one bulk write"""
     ti = kwargs['ti']
-    processed_data = ti.xcom_pull(task_ids='process')
-    return load_to_sql(processed_data)
+    processed_players = get_artifact(ti.xcom_pull(task_ids='extract_process'), [])
+    return load_players_to_sql(processed_players)
 
 with DAG(
     'tft_etl_pipeline',
@@ -44,8 +44,8 @@ with DAG(
     schedule=timedelta(days=1),
     catchup=False,
 ) as dag:
-    t1 = PythonOperator(task_id='extract', python_callable=extract_task)
-    t2 = PythonOperator(task_id='process', python_callable=process_task)
+    t1 = PythonOperator(task_id='collect_players', python_callable=collect_players_task)
+    t2 = PythonOperator(task_id='extract_process', python_callable=extract_process_task)
     t3 = PythonOperator(task_id='load', python_callable=load_task)
     
     t1 >> t2 >> t3
\ No newline at end of file
@@ -7,9 +7,11 @@ from airflow.providers.standard.operators.python import PythonOperator
 # Add the project root to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from Steps.extract import extract_data_from_api, extract_leaderboard_data, extract_player_details_from_summoner_id
-from Steps.process import process, process_leaderboard_data
-from Steps.load import load_to_sql, load_leaderboard_to_sql, load_combined_data
+from Steps.extract import extract_leaderboard_data, get_leaderboard_summoner_ids, resolve_player_details
+from Steps.process import process_leaderboard_columns
+from Steps.load import load_leaderboard_to_sql, load_players_to_sql
+from Steps.player_batch import get_tracked_players, extract_and_process_players
+from Steps.artifact_store import put_artifact, get_artifact
 
 default_args = {
     'owner': 'airflow',
@@ -24,24 +26,41 @@ default_args = {
 def extract_leaderboard_task(**kwargs):
     """Extract leaderboard data from Riot API"""
     print("Extracting leaderboard data...")
-    return extract_leaderboard_data()
+    leaderboard_data = extract_leaderboard_data()
+    # Only a reference to the payload goes through XCom
+    return put_artifact(leaderboard_data) if leaderboard_data else None
+
+def resolve_leaderboard_players_task(**kwargs):
+    """Resolve ladder summoner IDs to Riot IDs in parallel"""
+    ti = kwargs['ti']
+    leaderboard_data = get_artifact(ti.xcom_pull(task_ids='extract_leaderboard'))
+    
+    if not leaderboard_data:
+        print("No leaderboard data received from extraction")
+        return put_artifact({})
+    
+    summoner_ids = get_leaderboard_summoner_ids(leaderboard_data)
+    print(f"Resolving Riot IDs for {len(summoner_ids)} ladder players...")
+    return put_artifact(resolve_player_details(summoner_ids))
 
 def process_leaderboard_task(**kwargs):
     """Process raw leaderboard data into database format"""
     ti = kwargs['ti']
-    leaderboard_data = ti.xcom_pull(task_ids='extract_leaderboard')
+    leaderboard_data = get_artifact(ti.xcom_pull(task_ids='extract_leaderboard'))
+    player_details = get_artifact(ti.xcom_pull(task_ids='resolve_leaderboard_players'), {})
     
     if not leaderboard_data:
         print("No leaderboard data received from extraction")
-        return []
+        return None
     
     print("Processing leaderboard data...")
-    return process_leaderboard_data(leaderboard_data)
+    processed_leaderboard = process_leaderboard_columns(leaderboard_data, player_details)
+    return put_artifact(processed_leaderboard) if processed_leaderboard else None
 
 def load_leaderboard_task(**kwargs):
     """Load processed leaderboard data to database"""
     ti = kwargs['ti']
-    processed_leaderboard = ti.xcom_pull(task_ids='process_leaderboard')
+    processed_leaderboard = get_artifact(ti.xcom_pull(task_ids='process_leaderboard'))
     
     if not processed_leaderboard:
         print("No processed leaderboard data to load")
@@ -50,37 +69,40 @@ def load_leaderboard_task(**kwargs):
     print("Loading leaderboard data to database...")
     return load_leaderboard_to_sql(processed_leaderboard)
 
-def extract_individual_player_task(**kwargs):
-    """Extract individual player data (existing functionality)"""
-    # Example player info - you might want to parameterize this
-    tag_line = 'YBY1'
-    game_name = 'TLN YBY1'
-    print(f"Extracting data for player: {game_name}#{tag_line}")
-    return extract_data_from_api(tag_line, game_name)
+def collect_players_task(**kwargs):
+    """Collect registered users plus the resolved ladder players"""
+    ti = kwargs['ti']
+    player_details = get_artifact(ti.xcom_pull(task_ids='resolve_leaderboard_players'), {})
+    ladder_players = [
+        (details['game_name'], details['tag_line'])
+        for details in player_details.values()
+        if details.get('game_name') and details.get('tag_line')
+    ]
+    return put_artifact(get_tracked_players(ladder_players=ladder_players))
 
-def process_individual_player_task(**kwargs):
-    """Process individual player data (existing functionality)"""
+def extract_process_players_task(**kwargs):
+    """Extract and process all tracked players with bounded concurrency"""
     ti = kwargs['ti']
-    data, game_name, tag_line = ti.xcom_pull(task_ids='extract_individual_player')
+    players = get_artifact(ti.xcom_pull(task_ids='collect_players'))
     
-    if not data:
-        print("No individual player data received from extraction")
+    if not players:
+        print("No tracked players to extract")
         return None
     
-    print(f"Processing data for player: {game_name}#{tag_line}")
-    return process(data, game_name, tag_line)
+    print(f"Extracting data for {len(players)} players...")
+    return put_artifact(extract_and_process_players(players))
 
-def load_individual_player_task(**kwargs):
-    """Load individual player data to database (existing functionality)"""
+def load_players_task(**kwargs):
+    """Load all processed players to database in one bulk write"""
     ti = kwargs['ti']
-    processed_data = ti.xcom_pull(task_ids='process_individual_player')
+    processed_players = get_artifact(ti.xcom_pull(task_ids='extract_process_players'))
     
-    if not processed_data:
-        print("No processed individual player data to load")
+    if not processed_players:
+        print("No processed player data to load")
         return
     
-    print("Loading individual player data to database...")
-    return load_to_sql(processed_data)
+    print("Loading player data to database...")
+    return load_players_to_sql(processed_players)
 
 # Leaderboard ETL DAG
 with DAG(
@@ -98,6 +120,11 @@ with DAG(
         python_callable=extract_leaderboard_task
     )
     
+    resolve_leaderboard_players = PythonOperator(
+        task_id='resolve_leaderboard_players',
+        python_callable=resolve_leaderboard_players_task
+    )
+    
     process_leaderboard = PythonOperator(
         task_id='process_leaderboard',
         python_callable=process_leaderboard_task
@@ -109,32 +136,32 @@ with DAG(
     )
     
     # Set task dependencies
-    extract_leaderboard >> process_leaderboard >> load_leaderboard
+    extract_leaderboard >> resolve_leaderboard_players >> process_leaderboard >> load_leaderboard
 
-# Combined ETL DAG (both individual players and leaderboard)
+# Combined ETL DAG (both tracked players and leaderboard)
 with DAG(
     'tft_combined_etl_pipeline',
     default_args=default_args,
-    description='Combined ETL pipeline for TFT individual player and leaderboard data',
+    description='Combined ETL pipeline for TFT tracked player and leaderboard data',
     schedule=timedelta(days=1),  # Run daily
     catchup=False,
     tags=['tft', 'combined', 'etl'],
 ) as combined_dag:
     
-    # Individual player ETL tasks
-    extract_individual = PythonOperator(
-        task_id='extract_individual_player',
-        python_callable=extract_individual_player_task
+    # Tracked player ETL tasks
+    collect_players = PythonOperator(
+        task_id='collect_players',
+        python_callable=collect_players_task
     )
     
-    process_individual = PythonOperator(
-        task_id='process_individual_player',
-        python_callable=process_individual_player_task
+    extract_process_players = PythonOperator(
+        task_id='extract_process_players',
+        python_callable=extract_process_players_task
     )
     
-    load_individual = PythonOperator(
-        task_id='load_individual_player',
-        python_callable=load_individual_player_task
+    load_players = PythonOperator(
+        task_id='load_players',
+        python_callable=load_players_task
     )
     
     # Leaderboard ETL tasks (same as above)
@@ -143,6 +170,11 @@ with DAG(
         python_callable=extract_leaderboard_task
     )
     
+    resolve_leaderboard_players_combined = PythonOperator(
+        task_id='resolve_leaderboard_players',
+        python_callable=resolve_leaderboard_players_task
+    )
+    
     process_leaderboard_combined = PythonOperator(
         task_id='process_leaderboard',
         python_callable=process_leaderboard_task
@@ -153,6 +185,6 @@ with DAG(
         python_callable=load_leaderboard_task
     )
     
-    # Set task dependencies - both pipelines can run in parallel
-    extract_individual >> process_individual >> load_individual
-    extract_leaderboard_combined >> process_leaderboard_combined >> load_leaderboard_combined
+    # Set task dependencies - player batch runs alongside processing once ladder players are resolved
+    extract_leaderboard_combined >> resolve_leaderboard_players_combined >> process_leaderboard_combined >> load_leaderboard_combined
+    resolve_leaderboard_players_combined >> collect_players >> extract_process_players >> load_players
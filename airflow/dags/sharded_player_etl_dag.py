@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+import sys
+import os
+from airflow import DAG
+from airflow.providers.standard.operators.python import PythonOperator
+
+# Add the project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Steps.player_batch import (
+    get_tracked_players, get_ladder_players, partition_players, extract_and_process_players
+)
+from Steps.load import load_players_to_sql
+from Steps.artifact_store import put_artifact, get_artifact
+
+# Number of shards the tracked players are split into
+NUM_SHARDS = int(os.environ.get('PLAYER_ETL_SHARDS', 8))
+# Shards running at the same time
+MAX_ACTIVE_SHARDS = min(NUM_SHARDS, int(os.environ.get('PLAYER_ETL_MAX_ACTIVE_SHARDS', 4)))
+# Concurrent metatft profile downloads across all running shards. Shards only
+# call metatft (never the Riot API), so this is the budget they share. The
+# default gives every shard the PLAYER_BATCH_WORKERS of the unsharded DAG;
+# setting it to PLAYER_BATCH_WORKERS instead spreads the same load over more
+# Airflow workers without adding throughput.
+TOTAL_WORKERS = int(os.environ.get(
+    'PLAYER_ETL_TOTAL_WORKERS', int(os.environ.get('PLAYER_BATCH_WORKERS', 4)) * MAX_ACTIVE_SHARDS
+))
+
+default_args = {
+    'owner': 'airflow',
+    'depends_on_past': False,
+    'email_on_failure': False,
+    'email_on_retry': False,
+    'retries': 1,
+    'retry_delay': timedelta(minutes=5),
+    'start_date': datetime(2025, 5, 26),
+}
+
+def collect_shards_task(**kwargs):
+    """Collect tracked players and split them into shards"""
+    players = get_tracked_players(ladder_players=get_ladder_players())
+    shards = partition_players(players, NUM_SHARDS)
+
+    # One op_kwargs dict per mapped extract_process_shard task; the player
+    # lists stay in the artifact store and only references go through XCom
+    return [
+        {'shard': index, 'players_ref': put_artifact(shard_players)}
+        for index, shard_players in enumerate(shards)
+        if shard_players
+    ]
+
+def extract_process_shard_task(shard, players_ref, **kwargs):
+    """Extract and process one shard using its share of the metatft workers"""
+    players = get_artifact(players_ref, [])
+    max_workers = max(1, TOTAL_WORKERS // MAX_ACTIVE_SHARDS)
+
+    print(f"Shard {shard}: {len(players)} players, {max_workers} workers")
+    return put_artifact(extract_and_process_players(players, max_workers=max_workers))
+
+def load_shard_task(processed_ref, **kwargs):
+    """Load the processed players of one shard in one bulk write"""
+    return load_players_to_sql(get_artifact(processed_ref, []))
+
+with DAG(
+    'tft_sharded_player_etl_pipeline',
+    default_args=default_args,
+    description='Player ETL split into shards mapped across Airflow workers',
+    schedule=timedelta(days=1),
+    catchup=False,
+) as dag:
+    collect = PythonOperator(task_id='collect_shards', python_callable=collect_shards_task)
+
+    extract_process = PythonOperator.partial(
+        task_id='extract_process_shard',
+        python_callable=extract_process_shard_task,
+        max_active_tis_per_dagrun=MAX_ACTIVE_SHARDS,
+    ).expand(op_kwargs=collect.output)
+
+    load = PythonOperator.partial(
+        task_id='load_shard',
+        python_callable=load_shard_task,
+    ).expand(op_args=extract_process.output.map(lambda processed_ref: [processed_ref]))
+
+    collect >> extract_process >> load
@@ -24,6 +24,7 @@ from Steps.static_data import (
     fetch_traits_data, process_traits_data, load_traits_to_sql,
     fetch_augments_data, process_augments_data, load_augments_to_sql
 )
+from Steps.artifact_store import put_artifact, get_artifact
 
 # Default arguments
 default_args = {
@@ -65,18 +66,18 @@ def fetch_champions_task(ti):
     champions_data = fetch_champions_data(version)
     if not champions_data:
         raise ValueError("Failed to fetch champions data")
-    return champions_data
+    return put_artifact(champions_data)
 
 def process_champions_task(ti):
     version = ti.xcom_pull(task_ids='get_latest_version')
-    champions_data = ti.xcom_pull(task_ids='fetch_champions')
+    champions_data = get_artifact(ti.xcom_pull(task_ids='fetch_champions'))
     processed_champions = process_champions_data(champions_data, version)
     if not processed_champions:
         raise ValueError("Failed to process champions data")
-    return processed_champions
+    return put_artifact(processed_champions)
 
 def load_champions_task(ti):
-    processed_champions = ti.xcom_pull(task_ids='process_champions')
+    processed_champions = get_artifact(ti.xcom_pull(task_ids='process_champions'))
     load_champions_to_sql(processed_champions)
 
 t_fetch_champions = PythonOperator(
@@ -103,18 +104,18 @@ def fetch_tacticians_task(ti):
     tacticians_data = fetch_tacticians_data(version)
     if not tacticians_data:
         raise ValueError("Failed to fetch tacticians data")
-    return tacticians_data
+    return put_artifact(tacticians_data)
 
 def process_tacticians_task(ti):
     version = ti.xcom_pull(task_ids='get_latest_version')
-    tacticians_data = ti.xcom_pull(task_ids='fetch_tacticians')
+    tacticians_data = get_artifact(ti.xcom_pull(task_ids='fetch_tacticians'))
     processed_tacticians = process_tacticians_data(tacticians_data, version)
     if not processed_tacticians:
         raise ValueError("Failed to process tacticians data")
-    return processed_tacticians
+    return put_artifact(processed_tacticians)
 
 def load_tacticians_task(ti):
-    processed_tacticians = ti.xcom_pull(task_ids='process_tacticians')
+    processed_tacticians = get_artifact(ti.xcom_pull(task_ids='process_tacticians'))
     load_tacticians_to_sql(processed_tacticians)
 
 t_fetch_tacticians = PythonOperator(
@@ -141,18 +142,18 @@ def fetch_items_task(ti):
     items_data = fetch_items_data(version)
     if not items_data:
         raise ValueError("Failed to fetch items data")
-    return items_data
+    return put_artifact(items_data)
 
 def process_items_task(ti):
     version = ti.xcom_pull(task_ids='get_latest_version')
-    items_data = ti.xcom_pull(task_ids='fetch_items')
+    items_data = get_artifact(ti.xcom_pull(task_ids='fetch_items'))
     processed_items = process_items_data(items_data, version)
     if not processed_items:
         raise ValueError("Failed to process items data")
-    return processed_items
+    return put_artifact(processed_items)
 
 def load_items_task(ti):
-    processed_items = ti.xcom_pull(task_ids='process_items')
+    processed_items = get_artifact(ti.xcom_pull(task_ids='process_items'))
     load_items_to_sql(processed_items)
 
 t_fetch_items = PythonOperator(
@@ -179,18 +180,18 @@ def fetch_traits_task(ti):
     traits_data = fetch_traits_data(version)
     if not traits_data:
         raise ValueError("Failed to fetch traits data")
-    return traits_data
+    return put_artifact(traits_data)
 
 def process_traits_task(ti):
     version = ti.xcom_pull(task_ids='get_latest_version')
-    traits_data = ti.xcom_pull(task_ids='fetch_traits')
+    traits_data = get_artifact(ti.xcom_pull(task_ids='fetch_traits'))
     processed_traits = process_traits_data(traits_data, version)
     if not processed_traits:
         raise ValueError("Failed to process traits data")
-    return processed_traits
+    return put_artifact(processed_traits)
 
 def load_traits_task(ti):
-    processed_traits = ti.xcom_pull(task_ids='process_traits')
+    processed_traits = get_artifact(ti.xcom_pull(task_ids='process_traits'))
     load_traits_to_sql(processed_traits)
 
 t_fetch_traits = PythonOperator(
@@ -216,19 +217,19 @@ def fetch_augments_task(ti):
     version = ti.xcom_pull(task_ids='get_latest_version')
     augments_data = fetch_augments_data(version)
     # Augments might not be available through standard Data Dragon, so don't raise error
-    return augments_data or {}
+    return put_artifact(augments_data or {})
 
 def process_augments_task(ti):
     version = ti.xcom_pull(task_ids='get_latest_version')
-    augments_data = ti.xcom_pull(task_ids='fetch_augments')
+    augments_data = get_artifact(ti.xcom_pull(task_ids='fetch_augments'))
     # Process if data is available
     if augments_data:
         processed_augments = process_augments_data(augments_data, version)
-        return processed_augments
-    return []
+        return put_artifact(processed_augments)
+    return None
 
 def load_augments_task(ti):
-    processed_augments = ti.xcom_pull(task_ids='process_augments')
+    processed_augments = get_artifact(ti.xcom_pull(task_ids='process_augments'))
     if processed_augments:
         load_augments_to_sql(processed_augments)
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the memoized rating parser in Steps.process.
+Compares parse_rating with the split + re.findall parsing it replaced, on a
+ladder-sized corpus of rating strings. No database or network access is needed.
+
+Usage:
+    python bench_rating_parser.py [players] [matches_per_player]
+"""
+
+import re
+import sys
+import random
+import timeit
+
+from Steps.process import parse_rating
+
+
+def legacy_parse_rating(rating_text):
+    """The previous per-call parsing: split for tier/rank, re.findall for LP"""
+    parts = rating_text.split()
+    if len(parts) >= 2:
+        tier, rank = parts[0], parts[1]
+    else:
+        tier, rank = 'UNRANKED', ''
+    lp = int(re.findall(r'\d+', rating_text)[0])
+    return tier, rank, lp
+
+
+def build_corpus(players=1000, matches_per_player=50, seed=42):
+    """
+    Build the rating strings one ladder run parses: one profile rating plus
+    one per-match rating for each player, with LP drifting between matches.
+    """
+    rng = random.Random(seed)
+    corpus = []
+
+    for _ in range(players):
+        tier = rng.choice(["CHALLENGER", "GRANDMASTER", "MASTER"])
+        lp = rng.randint(0, 1500)
+        corpus.append(f"{tier} I {lp} LP")
+
+        for _ in range(matches_per_player):
+            lp = max(0, lp + rng.randint(-40, 50))
+            corpus.append(f"{tier} I {lp} LP")
+
+    return corpus
+
+
+def bench(func, corpus, repeat=5):
+    """Best time over `repeat` passes through the corpus"""
+    return min(timeit.repeat(lambda: [func(text) for text in corpus], number=1, repeat=repeat))
+
+
+def test_parsers_agree(corpus):
+    """Test that the memoized parser matches the legacy one on the corpus"""
+    print("🔧 Checking parser results...")
+    for text in corpus:
+        assert parse_rating(text) == legacy_parse_rating(text), text
+    print(f"✅ Parsers agree on {len(corpus)} ratings")
+
+
+if __name__ == "__main__":
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    matches_per_player = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    corpus = build_corpus(players, matches_per_player)
+    print(f"📊 Corpus: {len(corpus)} ratings, {len(set(corpus))} distinct")
+
+    test_parsers_agree(corpus)
+
+    legacy = bench(legacy_parse_rating, corpus)
+
+    parse_rating.cache_clear()
+    cold = min(timeit.repeat(
+        lambda: (parse_rating.cache_clear(), [parse_rating(text) for text in corpus]),
+        number=1, repeat=5
+    ))
+    warm = bench(parse_rating, corpus)
+
+    print(f"\n{'parser':<24}{'seconds':>10}{'ratings/s':>14}{'speedup':>10}")
+    for name, seconds in [("legacy split+findall", legacy), ("memoized (cold cache)", cold), ("memoized (warm cache)", warm)]:
+        print(f"{name:<24}{seconds:>10.4f}{len(corpus) / seconds:>14,.0f}{legacy / seconds:>9.1f}x")
+    print(f"\n{parse_rating.cache_info()}")
@@ -83,6 +83,48 @@ CREATE TABLE IF NOT EXISTS tft_match_companion (
     INDEX idx_placement (placement)
 );
 
+-- Match Sync State table: Per-player high-water mark for incremental match sync
+CREATE TABLE IF NOT EXISTS match_sync_state (
+    puuid VARCHAR(100) PRIMARY KEY,        -- Player PUUID
+    last_match_id VARCHAR(20) NOT NULL,    -- Newest match already extracted
+    last_match_timestamp BIGINT NOT NULL,  -- Its game_datetime (epoch milliseconds)
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Leaderboard Snapshot table: One row per leaderboard load
+CREATE TABLE IF NOT EXISTS leaderboard_snapshot (
+    snapshot_id INT AUTO_INCREMENT PRIMARY KEY,
+    taken_at TIMESTAMP NOT NULL,           -- last_updated of the loaded snapshot
+    num_entries INT NOT NULL,
+    
+    INDEX idx_taken_at (taken_at)
+);
+
+-- Leaderboard Snapshot Delta table: Per-player changes since the previous snapshot
+-- (players whose LP, position, wins and losses are unchanged get no row;
+-- summing a player's deltas up to a snapshot gives their values at that snapshot)
+CREATE TABLE IF NOT EXISTS leaderboard_snapshot_delta (
+    snapshot_id INT NOT NULL,
+    puuid VARCHAR(100) NOT NULL,           -- Player PUUID
+    lp_delta INT NOT NULL DEFAULT 0,
+    position_delta INT NOT NULL DEFAULT 0, -- Position 0 means off the ladder
+    wins_delta INT NOT NULL DEFAULT 0,
+    losses_delta INT NOT NULL DEFAULT 0,
+    
+    PRIMARY KEY (puuid, snapshot_id),
+    INDEX idx_snapshot (snapshot_id)
+);
+
+-- Leaderboard Player State table: Latest values per ladder player, the base for the next deltas
+CREATE TABLE IF NOT EXISTS leaderboard_player_state (
+    puuid VARCHAR(100) PRIMARY KEY,        -- Player PUUID
+    lp INT NOT NULL,
+    position INT NOT NULL,
+    wins INT NOT NULL,
+    losses INT NOT NULL,
+    snapshot_id INT NOT NULL               -- Snapshot that last changed the player
+);
+
 -- ===================================
 -- VIEWS FOR FRONTEND DEVELOPERS
 -- ===================================
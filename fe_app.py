@@ -68,6 +68,10 @@ with app.app_context():
     import fe_models
     import fe_routes
     
+    # Per-request SQL/render timing, Server-Timing headers and /metrics
+    import fe_instrumentation
+    fe_instrumentation.init_instrumentation(app)
+    
     # Create tables only if they don't exist
     try:
         db.create_all()
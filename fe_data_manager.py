@@ -1,32 +1,184 @@
 from fe_models import User, PlayerStats, MatchHistory, Champion, ChampionPick, LPHistory
-from fe_app import db
+from fe_app import app, db
+from flask import g
 from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from datetime import datetime, timedelta
+import os
+import threading
+import time
 import logging
 
-def get_user_stats(user_id):
-    """Get comprehensive user statistics"""
-    user = User.query.get(user_id)
-    if not user:
-        return None
+# Stored stats older than this are recomputed even without new matches
+STATS_STALE_SECONDS = int(os.environ.get("STATS_STALE_SECONDS", 3600))
+# How often queued stats recomputations are written back
+STATS_WRITE_BEHIND_SECONDS = float(os.environ.get("STATS_WRITE_BEHIND_SECONDS", 5))
+
+_pending_stats = set()
+_pending_lock = threading.Lock()
+_writer_thread = None
+
+def stats_are_stale(stats, match_count=None):
+    """
+    Whether stored stats miss ingested matches or are past the staleness threshold.
     
-    # Get or create player stats
-    stats = PlayerStats.query.filter_by(user_id=user_id).first()
-    if not stats:
-        stats = PlayerStats(user_id=user_id)
-        db.session.add(stats)
+    Matches are ingested by the ETL long after they are played, so their
+    played_at says nothing about whether the stats include them. The stats
+    count the matches they were computed from (games_played); a user with
+    more matches than that has had new ones ingested since.
+    """
+    if stats.last_updated is None:
+        return True
+    if match_count is not None and match_count > (stats.games_played or 0):
+        return True
+    return datetime.utcnow() - stats.last_updated > timedelta(seconds=STATS_STALE_SECONDS)
+
+def queue_stats_refresh(user_id):
+    """Queue a user's stats to be recomputed and saved by the background writer"""
+    global _writer_thread
+    
+    with _pending_lock:
+        _pending_stats.add(user_id)
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_stats_writer_loop, name='stats-write-behind', daemon=True)
+            _writer_thread.start()
+
+def flush_stats_refresh():
+    """Recompute and save the stats of every queued user in one transaction"""
+    with _pending_lock:
+        user_ids = list(_pending_stats)
+        _pending_stats.clear()
+    
+    if not user_ids:
+        return 0
+    
+    try:
+        existing = {stats.user_id: stats for stats in PlayerStats.query.filter(PlayerStats.user_id.in_(user_ids))}
+        for user_id in user_ids:
+            stats = existing.get(user_id)
+            if stats is None:
+                stats = PlayerStats(user_id=user_id)
+                db.session.add(stats)
+            stats.calculate_stats_from_matches()
         db.session.commit()
+        return len(user_ids)
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Stats write-behind failed: {e}")
+        return 0
+
+def _stats_writer_loop():
+    """Background thread that periodically writes back queued stats"""
+    while True:
+        time.sleep(STATS_WRITE_BEHIND_SECONDS)
+        with app.app_context():
+            flush_stats_refresh()
+
+def get_user_stats(user_id, match_count=None, match_window=None):
+    """
+    Get comprehensive user statistics without writing to the database.
     
-    # Update stats from match history
-    stats.calculate_stats_from_matches()
-    db.session.commit()
+    Stored stats are returned as they are while fresh. When they are missing,
+    computed from fewer matches than the user now has (match_count, counted
+    if not given) or past STATS_STALE_SECONDS, up-to-date stats are computed
+    in memory for this response and the recomputation is queued for the
+    background writer, so page views never issue INSERTs or UPDATEs.
+    A MatchWindow already loaded for the request supplies the count without
+    another query when it holds all of the user's matches.
+    """
+    stats = PlayerStats.query.filter_by(user_id=user_id).first()
+    if stats is None and User.query.get(user_id) is None:
+        return None
+    
+    if stats is not None:
+        if match_count is None and match_window is not None and match_window.is_complete:
+            match_count = len(match_window.matches)
+        if match_count is None:
+            match_count = db.session.query(func.count(MatchHistory.id))\
+                                    .filter(MatchHistory.user_id == user_id).scalar()
+        if not stats_are_stale(stats, match_count):
+            return stats
+    
+    # Compute current stats on a detached copy that the session never flushes
+    fresh = PlayerStats(user_id=user_id)
+    if stats is not None:
+        for column in PlayerStats.__table__.columns:
+            setattr(fresh, column.name, getattr(stats, column.name))
+    fresh.calculate_stats_from_matches()
     
-    return stats
+    queue_stats_refresh(user_id)
+    return fresh
 
-def get_recent_matches(user_id, limit=20):
-    """Get recent matches for a user"""
-    return MatchHistory.query.filter_by(user_id=user_id)\
-                           .order_by(MatchHistory.played_at.desc())\
-                           .limit(limit).all()
+# Matches loaded once per request and shared by the dashboard views
+MATCH_WINDOW_SIZE = 50
+
+class MatchWindow:
+    """A user's most recent matches, newest first, with the views derived from them"""
+    
+    def __init__(self, matches, size, eager_picks=True):
+        self.matches = matches
+        # Number of matches requested; fewer are loaded when the user has fewer
+        self.size = size
+        self.eager_picks = eager_picks
+    
+    @property
+    def is_complete(self):
+        """Whether the window holds all of the user's matches"""
+        return len(self.matches) < self.size
+    
+    def recent(self, limit):
+        """The `limit` most recent matches"""
+        return self.matches[:limit]
+    
+    def recent_placements(self, limit=20):
+        """Placements of the most recent matches, for the placement grid"""
+        return [match.placement for match in self.matches[:limit] if match.placement <= 8]
+    
+    def placement_distribution(self, limit=MATCH_WINDOW_SIZE):
+        """Count of each placement (1st-8th) over the most recent matches"""
+        distribution = [0] * 8
+        for match in self.matches[:limit]:
+            if 1 <= match.placement <= 8:
+                distribution[match.placement - 1] += 1
+        return distribution
+
+def get_match_window(user_id, size=MATCH_WINDOW_SIZE, eager_picks=True):
+    """
+    Get a user's recent matches, querying them at most once per request.
+    
+    The window is cached on flask.g, so every view of the same request that
+    needs recent matches shares one ORDER BY played_at scan. Champion picks
+    are eager-loaded unless eager_picks is False (e.g. for chart data).
+    """
+    windows = g.setdefault('match_windows', {})
+    window = windows.get(user_id)
+    
+    # A larger window already holds every smaller slice
+    if window is None or window.size < size or (eager_picks and not window.eager_picks):
+        size = max(size, window.size) if window else size
+        window = MatchWindow(get_recent_matches(user_id, size, eager_picks), size, eager_picks)
+        windows[user_id] = window
+    
+    return window
+
+def get_recent_matches(user_id, limit=20, eager_picks=True):
+    """
+    Get recent matches for a user.
+    
+    With eager_picks, each match's champion picks and their champions are
+    loaded up front (one extra query for all picks, champions joined in), so
+    templates iterating match.champion_picks and pick.champion render in a
+    fixed number of queries instead of one or more per match.
+    """
+    query = MatchHistory.query.filter_by(user_id=user_id)\
+                              .order_by(MatchHistory.played_at.desc())
+    
+    if eager_picks:
+        query = query.options(
+            selectinload(MatchHistory.champion_picks).joinedload(ChampionPick.champion)
+        )
+    
+    return query.limit(limit).all()
 
 def get_top_champions(user_id, limit=5):
     """Get most played champions for a user"""
@@ -79,14 +231,7 @@ def get_lp_history(user_id, limit=100):
 
 def calculate_placement_distribution(user_id, limit=50):
     """Calculate placement distribution for charts"""
-    matches = get_recent_matches(user_id, limit)
-    distribution = [0] * 8
-    
-    for match in matches:
-        if 1 <= match.placement <= 8:
-            distribution[match.placement - 1] += 1
-    
-    return distribution
+    return get_match_window(user_id, limit, eager_picks=False).placement_distribution(limit)
 
 def get_match_details(match_id):
     """Get detailed match information including champion picks"""
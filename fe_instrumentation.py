@@ -0,0 +1,185 @@
+"""
+Request-scoped SQL and render timing for the Flask app.
+
+For every request this records the number of SQL statements, total DB time,
+the slowest statement and template render time, then:
+- adds a Server-Timing header (visible in the browser dev tools),
+- logs a warning when a request runs more than SQL_QUERY_WARN_THRESHOLD
+  statements, which usually means an N+1 query,
+- aggregates the numbers per endpoint for the /metrics endpoint
+  (Prometheus text format, or JSON with ?format=json).
+
+Configuration (environment variables):
+- INSTRUMENTATION_ENABLED: set to "false" to turn everything off
+- SQL_QUERY_WARN_THRESHOLD: statements per request before warning (default 30)
+- METRICS_TOKEN: enables /metrics, which then requires ?token=<value> or a
+  Bearer token; without it the endpoint is not registered, since its JSON
+  form includes SQL statement text
+"""
+
+import os
+import hmac
+import time
+import logging
+import threading
+from flask import g, request, jsonify, Response, abort, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_QUERY_WARN_THRESHOLD = int(os.environ.get("SQL_QUERY_WARN_THRESHOLD", 30))
+
+# Longest statement text kept for the slowest-query report
+MAX_STATEMENT_LENGTH = 500
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute never runs for a failed statement
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_start_time'):
+        conn.info['query_start_time'].pop()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+
+    # Statements outside a request (startup, background writers) are not counted
+    if not has_request_context() or 'sql_count' not in g:
+        return
+
+    g.sql_count += 1
+    g.sql_time += elapsed
+    if elapsed > g.sql_slowest[0]:
+        g.sql_slowest = (elapsed, statement[:MAX_STATEMENT_LENGTH])
+
+
+def _before_render(sender, template, context, **extra):
+    if 'render_started' in g:
+        g.render_started.append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    if g.get('render_started'):
+        g.render_time += time.perf_counter() - g.render_started.pop()
+
+
+def _start_request():
+    g.request_start = time.perf_counter()
+    g.sql_count = 0
+    g.sql_time = 0.0
+    g.sql_slowest = (0.0, None)
+    g.render_started = []
+    g.render_time = 0.0
+
+
+def _finish_request(response):
+    if 'request_start' not in g:
+        return response
+
+    total = time.perf_counter() - g.request_start
+    endpoint = request.endpoint or 'unknown'
+
+    response.headers.add('Server-Timing', f'db;dur={g.sql_time * 1000:.1f};desc="{g.sql_count} queries"')
+    response.headers.add('Server-Timing', f'render;dur={g.render_time * 1000:.1f}')
+    response.headers.add('Server-Timing', f'total;dur={total * 1000:.1f}')
+
+    if g.sql_count > SQL_QUERY_WARN_THRESHOLD:
+        logging.warning(f"{request.method} {request.path} ran {g.sql_count} SQL queries "
+                        f"({g.sql_time * 1000:.1f} ms); possible N+1")
+
+    record_request(endpoint, total, g.sql_count, g.sql_time, g.sql_slowest, g.render_time)
+    return response
+
+
+def record_request(endpoint, total, sql_count, sql_time, sql_slowest, render_time):
+    """Add one request's measurements to the per-endpoint aggregates"""
+    with _metrics_lock:
+        stats = _metrics.setdefault(endpoint, {
+            'requests': 0,
+            'total_seconds': 0.0,
+            'sql_queries': 0,
+            'sql_seconds': 0.0,
+            'render_seconds': 0.0,
+            'max_sql_queries': 0,
+            'slowest_query_seconds': 0.0,
+            'slowest_query': None,
+        })
+        stats['requests'] += 1
+        stats['total_seconds'] += total
+        stats['sql_queries'] += sql_count
+        stats['sql_seconds'] += sql_time
+        stats['render_seconds'] += render_time
+        stats['max_sql_queries'] = max(stats['max_sql_queries'], sql_count)
+        if sql_slowest[0] > stats['slowest_query_seconds']:
+            stats['slowest_query_seconds'], stats['slowest_query'] = sql_slowest
+
+
+def get_metrics():
+    """Get a copy of the per-endpoint aggregates"""
+    with _metrics_lock:
+        return {endpoint: dict(stats) for endpoint, stats in _metrics.items()}
+
+
+def format_prometheus(metrics):
+    """Render the aggregates in the Prometheus text exposition format"""
+    series = [
+        ('flask_requests_total', 'counter', 'Requests handled', 'requests'),
+        ('flask_request_seconds_total', 'counter', 'Total request time', 'total_seconds'),
+        ('flask_sql_queries_total', 'counter', 'SQL statements executed', 'sql_queries'),
+        ('flask_sql_seconds_total', 'counter', 'Time spent in SQL statements', 'sql_seconds'),
+        ('flask_render_seconds_total', 'counter', 'Time spent rendering templates', 'render_seconds'),
+        ('flask_sql_queries_max', 'gauge', 'Most SQL statements in a single request', 'max_sql_queries'),
+        ('flask_sql_slowest_query_seconds', 'gauge', 'Slowest single SQL statement', 'slowest_query_seconds'),
+    ]
+
+    lines = []
+    for name, kind, description, key in series:
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for endpoint, stats in sorted(metrics.items()):
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {stats[key]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_endpoint():
+    """Per-endpoint request, SQL and render metrics"""
+    token = os.environ.get("METRICS_TOKEN")
+    supplied = request.args.get('token') or request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        abort(403)
+
+    metrics = get_metrics()
+    if request.args.get('format') == 'json':
+        return jsonify(metrics)
+    return Response(format_prometheus(metrics), mimetype='text/plain; version=0.0.4')
+
+
+def init_instrumentation(app):
+    """
+    Hook the instrumentation into a Flask app and all SQLAlchemy engines.
+
+    Args:
+        app (Flask): The application to instrument
+    """
+    if os.environ.get("INSTRUMENTATION_ENABLED", "true").lower() == "false":
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    if os.environ.get("METRICS_TOKEN"):
+        app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
@@ -1,4 +1,5 @@
 from fe_app import db
+from sqlalchemy import func, case, true
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 import re
@@ -79,31 +80,61 @@ class PlayerStats(db.Model):
             return f"{self.tier.title()} {self.rank} ({self.league_points} LP)"
     
     def calculate_stats_from_matches(self):
-        """Calculate stats from user's match history"""
-        matches = MatchHistory.query.filter_by(user_id=self.user_id).order_by(MatchHistory.played_at.desc()).limit(20).all()
+        """Calculate stats from user's match history in a single aggregate query"""
+        row = PlayerStats.match_aggregates(self.user_id)
         
-        if matches:
-            # Calculate average placement
-            total_placement = sum(match.placement for match in matches)
-            self.average_placement = round(total_placement / len(matches), 1)
+        if row.recent_games:
+            # Calculate average placement and top 4 rate over the 20 most recent matches
+            self.average_placement = round(float(row.recent_avg_placement), 1)
+            self.top_four_rate = round((int(row.recent_top_four) / row.recent_games) * 100, 1)
             
-            # Calculate top 4 rate
-            top_four_matches = sum(1 for match in matches if match.placement <= 4)
-            self.top_four_rate = round((top_four_matches / len(matches)) * 100, 1)
-            
-            # Update games played
-            all_matches = MatchHistory.query.filter_by(user_id=self.user_id).count()
-            self.games_played = all_matches
-            
-            # Calculate wins/losses (top 4 is win)
-            self.wins = sum(1 for match in MatchHistory.query.filter_by(user_id=self.user_id).all() if match.placement <= 4)
-            self.losses = all_matches - self.wins
+            # Update games played and wins/losses (top 4 is win) over all matches
+            self.games_played = int(row.total_games)
+            self.wins = int(row.total_top_four)
+            self.losses = self.games_played - self.wins
+        
+        self.last_updated = datetime.utcnow()
+    
+    @staticmethod
+    def match_aggregates(user_id, recent_limit=20):
+        """
+        Aggregate a user's match history in one round trip.
+        
+        Returns a row with recent_games, recent_avg_placement and
+        recent_top_four over the most recent matches, and total_games and
+        total_top_four over all of them.
+        """
+        top_four = case((MatchHistory.placement <= 4, 1), else_=0)
+        
+        recent = db.select(MatchHistory.placement.label('placement'), top_four.label('is_top_four'))\
+                   .where(MatchHistory.user_id == user_id)\
+                   .order_by(MatchHistory.played_at.desc())\
+                   .limit(recent_limit).subquery()
+        
+        recent_stats = db.select(
+            func.count().label('recent_games'),
+            func.avg(recent.c.placement).label('recent_avg_placement'),
+            func.coalesce(func.sum(recent.c.is_top_four), 0).label('recent_top_four')
+        ).subquery()
+        
+        total_stats = db.select(
+            func.count(MatchHistory.id).label('total_games'),
+            func.coalesce(func.sum(top_four), 0).label('total_top_four')
+        ).where(MatchHistory.user_id == user_id).subquery()
+        
+        # Both subqueries return exactly one row, so they are joined unconditionally
+        return db.session.execute(
+            db.select(recent_stats, total_stats).select_from(recent_stats.join(total_stats, true()))
+        ).one()
     
     def __repr__(self):
         return f'<PlayerStats {self.user.username} - {self.rank_display}>'
 
 class MatchHistory(db.Model):
     """Model for storing individual match results"""
+    # Recent-match queries filter by user and sort by played_at
+    __table_args__ = (db.Index('idx_match_history_user_played', 'user_id', 'played_at'),)
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
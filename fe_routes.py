@@ -2,7 +2,7 @@ from flask import render_template, request, redirect, url_for, flash, session, j
 from fe_app import app, db
 from fe_models import User, PlayerStats, MatchHistory, Champion, ChampionPick, LPHistory, LeaderboardEntry
 from fe_utils import login_required, get_placement_color, calculate_average_placement
-from fe_data_manager import get_user_stats, get_recent_matches, get_top_champions, get_lp_history
+from fe_data_manager import get_user_stats, get_match_window, get_top_champions, get_lp_history
 import logging
 
 @app.route('/')
@@ -32,29 +32,21 @@ def player_detail(player_name, tagline):
         ).first()
     
     if user and user.player_stats:
-        # Registered user - show full stats
-        stats = get_user_stats(user.id)
-        recent_matches = get_recent_matches(user.id, limit=20)
+        # Registered user - show full stats from one recent-match query
+        match_window = get_match_window(user.id, 20)
+        stats = get_user_stats(user.id, match_window=match_window)
         top_champions = get_top_champions(user.id)
         lp_history = get_lp_history(user.id)
         
-        # Calculate placement distribution for last 20 matches
-        placement_dist = [0] * 8
-        recent_placements = []
-        
-        for match in recent_matches:
-            if match.placement <= 8:
-                placement_dist[match.placement - 1] += 1
-                recent_placements.append(match.placement)
-        
         return render_template('player_detail.html', 
                              user=user, 
                              stats=stats, 
-                             recent_matches=recent_matches,
+                             recent_matches=match_window.recent(20),
                              top_champions=top_champions,
                              lp_history=lp_history,
-                             placement_distribution=placement_dist,
-                             recent_placements=recent_placements[:20])
+                             # Placement distribution for last 20 matches
+                             placement_distribution=match_window.placement_distribution(20),
+                             recent_placements=match_window.recent_placements(20))
     else:
         # Check leaderboard entry
         leaderboard_entry = LeaderboardEntry.query.filter_by(
@@ -169,36 +161,24 @@ def dashboard():
         flash('User not found.', 'error')
         return redirect(url_for('login'))
     
+    # Load the 50 most recent matches once; every match view below is a slice
+    match_window = get_match_window(user_id, 50)
+    
     # Get user statistics
-    stats = get_user_stats(user_id)
-    recent_matches = get_recent_matches(user_id, limit=10)
+    stats = get_user_stats(user_id, match_window=match_window)
     top_champions = get_top_champions(user_id)
     lp_history = get_lp_history(user_id)
     
-    # Calculate placement distribution for charts
-    all_matches = get_recent_matches(user_id, limit=50)
-    placement_distribution = [0] * 8
-    recent_placements = []
-    
-    # Get last 20 matches for placement grid
-    last_20_matches = get_recent_matches(user_id, limit=20)
-    for match in last_20_matches:
-        if match.placement <= 8:
-            recent_placements.append(match.placement)
-    
-    # Calculate placement distribution from last 50 matches
-    for match in all_matches:
-        if match.placement <= 8:
-            placement_distribution[match.placement - 1] += 1
-    
     return render_template('dashboard.html',
                          user=user,
                          stats=stats,
-                         recent_matches=recent_matches,
+                         recent_matches=match_window.recent(10),
                          top_champions=top_champions,
                          lp_history=lp_history,
-                         placement_distribution=placement_distribution,
-                         recent_placements=recent_placements)
+                         # Placement distribution from last 50 matches
+                         placement_distribution=match_window.placement_distribution(50),
+                         # Last 20 matches for placement grid
+                         recent_placements=match_window.recent_placements(20))
 
 @app.route('/refresh_data')
 @login_required
@@ -240,12 +220,7 @@ def api_placement_distribution(user_id):
     if session['user_id'] != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    matches = get_recent_matches(user_id, limit=50)
-    distribution = [0] * 8
-    
-    for match in matches:
-        if match.placement <= 8:
-            distribution[match.placement - 1] += 1
+    distribution = get_match_window(user_id, 50, eager_picks=False).placement_distribution(50)
     
     return jsonify({
         'labels': ['1st', '2nd', '3rd', '4th', '5th', '6th', '7th', '8th'],
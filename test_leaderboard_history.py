@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the delta-encoded leaderboard history.
+Snapshots are diffed in memory; no database is needed.
+"""
+
+from Steps.leaderboard_history import snapshot_states, compute_leaderboard_deltas, updated_player_states
+
+
+def entry(puuid, lp, position, wins, losses):
+    return {'puuid': puuid, 'league_points': lp, 'rank_position': position, 'wins': wins, 'losses': losses}
+
+
+def record_snapshots(snapshots):
+    """
+    Diff a sequence of snapshots the way append_leaderboard_snapshot does.
+
+    Returns:
+        tuple: (per-snapshot deltas, stored player states after the last snapshot)
+    """
+    stored = {}
+    history = []
+    for entries in snapshots:
+        current, unresolved = snapshot_states(entries)
+        deltas = compute_leaderboard_deltas(stored, current, unresolved)
+        stored.update(updated_player_states(stored, current, deltas))
+        history.append(deltas)
+    return history, stored
+
+
+def running_values(history, puuid):
+    """A player's values at every snapshot with a delta, as running sums"""
+    totals = [0, 0, 0, 0]
+    values = []
+    for deltas in history:
+        for delta in deltas:
+            if delta[0] == puuid:
+                totals = [total + change for total, change in zip(totals, delta[1:])]
+                values.append(tuple(totals))
+    return values
+
+
+def test_first_appearance_and_change():
+    """Test that a new player's first delta is their full values, then only changes"""
+    print("🔧 Testing first appearance and changes...")
+    history, stored = record_snapshots([
+        [entry('a', 1000, 1, 50, 40), entry('b', 900, 2, 30, 30)],
+        [entry('a', 1040, 1, 51, 40), entry('b', 900, 2, 30, 30)],
+    ])
+
+    assert sorted(history[0]) == [('a', 1000, 1, 50, 40), ('b', 900, 2, 30, 30)]
+    # An unchanged player gets no delta
+    assert history[1] == [('a', 40, 0, 1, 0)]
+    assert running_values(history, 'a') == [(1000, 1, 50, 40), (1040, 1, 51, 40)]
+    assert stored['a'] == (1040, 1, 51, 40)
+    print("✅ First appearance and changes recorded")
+
+
+def test_drop_off_and_rejoin():
+    """Test that a player leaving the ladder keeps LP with position 0, then rejoins"""
+    print("\n🚪 Testing drop-off and rejoin...")
+    history, stored = record_snapshots([
+        [entry('a', 1000, 1, 50, 40), entry('b', 900, 2, 30, 30)],
+        [entry('b', 950, 1, 31, 30)],
+        [entry('b', 950, 1, 31, 30), entry('a', 980, 2, 50, 41)],
+    ])
+
+    assert ('a', 0, -1, 0, 0) in history[1]
+    assert stored['a'] == (980, 2, 50, 41)
+    assert running_values(history, 'a') == [(1000, 1, 50, 40), (1000, 0, 50, 40), (980, 2, 50, 41)]
+    print("✅ Drop-off and rejoin recorded")
+
+
+def test_unresolved_entries_keep_missing_players():
+    """Test that a failed PUUID lookup is not recorded as a drop-off"""
+    print("\n❔ Testing unresolved entries...")
+    history, stored = record_snapshots([
+        [entry('a', 1000, 1, 50, 40), entry('b', 900, 2, 30, 30)],
+        # 'a' could not be resolved this time
+        [entry(None, 1010, 1, 51, 40), entry('b', 900, 2, 30, 30)],
+        [entry('a', 1010, 1, 51, 40), entry('b', 900, 2, 30, 30)],
+    ])
+
+    assert history[1] == []
+    assert history[2] == [('a', 10, 0, 1, 0)]
+    assert running_values(history, 'a') == [(1000, 1, 50, 40), (1010, 1, 51, 40)]
+    assert stored['a'] == (1010, 1, 51, 40)
+    print("✅ Unresolved entries do not fake a drop-off")
+
+
+def test_columns_and_duplicates():
+    """Test snapshot_states on columns, keeping a player's best-ranked entry"""
+    print("\n📊 Testing column snapshots...")
+    columns = {
+        'puuid': ['a', None, 'a'],
+        'league_points': [1000, 950, 900],
+        'rank_position': [1, 2, 3],
+        'wins': [50, 40, 45],
+        'losses': [40, 30, 35],
+    }
+    states, unresolved = snapshot_states(columns)
+    assert states == {'a': (1000, 1, 50, 40)}
+    assert unresolved == 1
+    print("✅ Column snapshots parsed")
+
+
+if __name__ == "__main__":
+    test_first_appearance_and_change()
+    test_drop_off_and_rejoin()
+    test_unresolved_entries_keep_missing_players()
+    test_columns_and_duplicates()
+    print("\n🎉 All leaderboard history tests passed!")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the NumPy match statistics in Steps.process, compared
+against the per-match loop they replaced.
+No database or network access is needed.
+"""
+
+import os
+import time
+import random
+import datetime
+
+import numpy as np
+
+from Steps.process import compute_match_stats, format_timestamps, ROLLING_WINDOW
+
+
+def legacy_match_stats(placements):
+    """The previous per-match loop: win/loss counts, average and top 4 rate"""
+    wins = 0
+    losses = 0
+    for placement in placements:
+        if placement <= 4:
+            wins += 1
+        else:
+            losses += 1
+
+    avg_placement = sum(placements) / len(placements) if placements else 8.0
+    top4_rate = (wins / len(placements)) if placements else 0.0
+    return wins, losses, avg_placement, top4_rate
+
+
+def legacy_timestamps(timestamps_ms):
+    """The previous per-match timestamp formatting"""
+    return [
+        datetime.datetime.fromtimestamp(ts / 1000).strftime('%Y-%m-%d %H:%M:%S')
+        for ts in timestamps_ms
+    ]
+
+
+def set_timezone(tz):
+    """Switch the process's local timezone (POSIX only)"""
+    if tz is None:
+        os.environ.pop('TZ', None)
+    else:
+        os.environ['TZ'] = tz
+    time.tzset()
+
+
+def test_stats_match_legacy_loop():
+    """Test that the NumPy statistics agree with the old loop"""
+    print("🔧 Testing match statistics against the per-match loop...")
+    rng = random.Random(42)
+
+    for num_games in [1, 3, ROLLING_WINDOW, 50]:
+        placements = [rng.randint(1, 8) for _ in range(num_games)]
+        stats = compute_match_stats(np.array(placements, dtype=np.int64))
+
+        wins, losses, avg_placement, top4_rate = legacy_match_stats(placements)
+        assert (stats['wins'], stats['losses']) == (wins, losses)
+        assert abs(stats['avg_placement'] - avg_placement) < 1e-9
+        assert abs(stats['top4_rate'] - top4_rate) < 1e-9
+
+        assert stats['placement_histogram'] == [placements.count(p) for p in range(1, 9)]
+    print("✅ Statistics agree")
+
+
+def test_rolling_windows():
+    """Test the rolling averages against a plain sliding window"""
+    print("\n📈 Testing rolling windows...")
+    rng = random.Random(7)
+    placements = [rng.randint(1, 8) for _ in range(25)]
+    stats = compute_match_stats(np.array(placements, dtype=np.int64))
+
+    windows = [placements[i:i + ROLLING_WINDOW] for i in range(len(placements) - ROLLING_WINDOW + 1)]
+    assert stats['rolling_avg_placement'] == [round(sum(w) / ROLLING_WINDOW, 2) for w in windows]
+    assert stats['rolling_top4_rate'] == [round(sum(p <= 4 for p in w) / ROLLING_WINDOW, 2) for w in windows]
+
+    # Fewer games than one window gives no rolling values
+    short = compute_match_stats(np.array(placements[:ROLLING_WINDOW - 1], dtype=np.int64))
+    assert short['rolling_avg_placement'] == [] and short['rolling_top4_rate'] == []
+    print("✅ Rolling windows agree")
+
+
+def test_no_matches():
+    """Test the statistics of a player without matches"""
+    print("\n🕳️ Testing empty match list...")
+    stats = compute_match_stats(np.array([], dtype=np.int64))
+    wins, losses, avg_placement, top4_rate = legacy_match_stats([])
+    assert (stats['wins'], stats['losses'], stats['avg_placement'], stats['top4_rate']) == \
+        (wins, losses, avg_placement, top4_rate)
+    assert stats['placement_histogram'] == [0] * 8
+    assert format_timestamps(np.array([], dtype=np.int64)) == []
+    print("✅ Empty match list handled")
+
+
+def test_timestamps_match_legacy():
+    """Test timestamp formatting with and without a DST change in the range"""
+    print("\n🕒 Testing timestamp formatting...")
+    original_tz = os.environ.get('TZ')
+
+    try:
+        # Fixed offset: the whole array is shifted in one step
+        set_timezone('Asia/Ho_Chi_Minh')
+        timestamps = [1716700000000 + i * 3_600_123 for i in range(50)]
+        assert format_timestamps(np.array(timestamps, dtype=np.int64)) == legacy_timestamps(timestamps)
+
+        # DST ends on 2024-10-27 in Berlin: falls back to per-match formatting
+        set_timezone('Europe/Berlin')
+        start = int(datetime.datetime(2024, 10, 26, 12, tzinfo=datetime.timezone.utc).timestamp() * 1000)
+        timestamps = [start + i * 1_800_000 for i in range(60)]
+        assert format_timestamps(np.array(timestamps, dtype=np.int64)) == legacy_timestamps(timestamps)
+
+        # Different offsets on different days also use the per-match path
+        timestamps = [start, start + 120 * 86_400_000]
+        assert format_timestamps(np.array(timestamps, dtype=np.int64)) == legacy_timestamps(timestamps)
+
+        # Casablanca changes offset twice a month apart around Ramadan, so the
+        # endpoints share an offset while a day in between does not
+        set_timezone('Africa/Casablanca')
+        timestamps = [
+            int(datetime.datetime(2024, month, day, tzinfo=datetime.timezone.utc).timestamp() * 1000)
+            for month, day in [(3, 1), (3, 25), (4, 30)]
+        ]
+        assert format_timestamps(np.array(timestamps, dtype=np.int64)) == legacy_timestamps(timestamps)
+    finally:
+        set_timezone(original_tz)
+    print("✅ Timestamps agree")
+
+
+if __name__ == "__main__":
+    test_stats_match_legacy_loop()
+    test_rolling_windows()
+    test_no_matches()
+    test_timestamps_match_legacy()
+    print("\n🎉 All match statistics tests passed!")
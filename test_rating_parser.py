@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the memoized rating parser in Steps.process.
+No database or network access is needed.
+"""
+
+from Steps.process import parse_rating, parse_rating_from_text
+
+
+def test_division_ratings():
+    """Test ratings with a division, including multi-letter divisions"""
+    print("🔧 Testing ratings with a division...")
+    assert parse_rating("CHALLENGER I 1942 LP") == ("CHALLENGER", "I", 1942)
+    assert parse_rating("DIAMOND IV 12 LP") == ("DIAMOND", "IV", 12)
+    assert parse_rating("PLATINUM III 0 LP") == ("PLATINUM", "III", 0)
+    assert parse_rating("GOLD II 75 LP") == ("GOLD", "II", 75)
+    print("✅ Divisions parsed")
+
+
+def test_ratings_without_division():
+    """Test that a rating without a division gets an empty rank, not the LP"""
+    print("\n🏆 Testing ratings without a division...")
+    assert parse_rating("GRANDMASTER 800 LP") == ("GRANDMASTER", "", 800)
+    assert parse_rating("MASTER 0 LP") == ("MASTER", "", 0)
+    print("✅ Missing divisions handled")
+
+
+def test_ratings_without_lp():
+    """Test that text without LP, empty text and None fall back to UNRANKED"""
+    print("\n❔ Testing ratings without LP...")
+    for text in ["UNRANKED", "Unranked", "DIAMOND IV", "", None]:
+        assert parse_rating(text) == ("UNRANKED", "", 0), text
+    print("✅ Ratings without LP fall back to UNRANKED")
+
+
+def test_legacy_wrapper_agrees():
+    """Test that parse_rating_from_text returns the same as parse_rating"""
+    print("\n🔁 Testing parse_rating_from_text...")
+    for text in ["CHALLENGER I 1942 LP", "GRANDMASTER 800 LP", "DIAMOND IV", ""]:
+        assert parse_rating_from_text(text) == parse_rating(text), text
+    print("✅ Wrapper agrees")
+
+
+if __name__ == "__main__":
+    test_division_ratings()
+    test_ratings_without_division()
+    test_ratings_without_lp()
+    test_legacy_wrapper_agrees()
+    print("\n🎉 All rating parser tests passed!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the rate-limit-aware Riot API client.
+No API key or network access is needed.
+"""
+
+import time
+
+from Steps.riot_client import RateLimitBucket, RiotClient, parse_rate_limit_header
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None):
+        self.calls.append(url)
+        return self.responses.pop(0)
+
+
+def test_parse_rate_limit_header():
+    """Test parsing of X-App-Rate-Limit style headers"""
+    print("🔧 Testing rate limit header parsing...")
+    assert parse_rate_limit_header("20:1,100:120") == [(20, 1), (100, 120)]
+    assert parse_rate_limit_header("") == []
+    assert parse_rate_limit_header(None) == []
+    print("✅ Header parsing works")
+
+
+def test_bucket_limits_requests_per_window():
+    """Test that a bucket refuses requests once a window is full"""
+    print("\n🪣 Testing rate limit bucket windows...")
+    bucket = RateLimitBucket([(2, 1), (3, 10)])
+
+    now = 100.0
+    for _ in range(2):
+        assert bucket.wait_time(now) == 0
+        bucket.record(now)
+
+    # Third request in the same second must wait for the 1s window
+    assert abs(bucket.wait_time(now) - 1.0) < 1e-9
+    bucket.record(now + 1.0)
+
+    # Fourth request is held back by the 10s window
+    assert abs(bucket.wait_time(now + 1.0) - 9.0) < 1e-9
+    print("✅ Bucket windows enforced")
+
+
+def test_bucket_syncs_server_counts():
+    """Test that server-reported counts are added to the local window"""
+    print("\n🔄 Testing server count sync...")
+    bucket = RateLimitBucket([(5, 1)])
+    bucket.sync_counts([(5, 1)], 50.0)
+    assert bucket.wait_time(50.0) > 0
+    print("✅ Server counts synced")
+
+
+def test_client_retries_after_429():
+    """Test that the client honours Retry-After and tracks regions separately"""
+    print("\n⏳ Testing 429 handling...")
+    client = RiotClient(api_key="test-key", max_retries=2)
+    client.session = FakeSession([
+        FakeResponse(429, {"Retry-After": "0.05", "X-Rate-Limit-Type": "application"}),
+        FakeResponse(200, {"X-App-Rate-Limit": "20:1,100:120", "X-App-Rate-Limit-Count": "2:1,2:120"}),
+    ])
+
+    start = time.monotonic()
+    response = client.get("https://vn2.api.riotgames.com/tft/league/v1/challenger", method="league-tier")
+    elapsed = time.monotonic() - start
+
+    assert response.status_code == 200
+    assert len(client.session.calls) == 2
+    assert elapsed >= 0.05
+    assert set(client.app_buckets) == {"vn2"}
+    print(f"✅ Retried after 429 in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_parse_rate_limit_header()
+    test_bucket_limits_requests_per_window()
+    test_bucket_syncs_server_counts()
+    test_client_retries_after_429()
+    print("\n🎉 All Riot client tests passed!")